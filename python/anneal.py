@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from evaluator import PenaltyEvaluator
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+from solution import Solution
+from stencil import disc_offsets
+from watchdog import checkpoint
+
+# Relative frequencies of the move types.
+_MOVE_WEIGHTS = (("shift", 60), ("jump", 15), ("remove", 15), ("add", 10))
+
+# Number of moves between clock reads.
+_CHECK_EVERY = 256
+
+
+@dataclasses.dataclass
+class AnnealStats:
+    moves: int = 0
+    accepted: int = 0
+    elapsed: float = 0.0
+    # (seconds since start, best penalty) every time the best improves.
+    trace: List[Tuple[float, float]] = dataclasses.field(default_factory=list)
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def anneal(instance: Instance, time_limit: float = 10.0, seed: int = 0,
+           start_temperature: float = 50.0, end_temperature: float = 0.5,
+           initial: Optional[Solution] = None,
+           verbose: bool = False) -> Tuple[Solution, AnnealStats]:
+    """Runs simulated annealing over valid tower sets for time_limit seconds.
+
+    Each step proposes one of: shifting a tower within the coverage radius,
+    jumping a tower to a candidate cell of instance.reduction(), removing a
+    tower, or adding one at a candidate cell. Moves are scored incrementally
+    by a PenaltyEvaluator and moves that would uncover a city are rejected,
+    so the current state is always valid. The temperature decays
+    geometrically over the time budget.
+    """
+    rng = random.Random(seed)
+    # Added and jumping towers only go to the reduced candidate cells.
+    cells = [instance.coverage_index().cell_point(row)
+             for row in instance.reduction().candidates]
+    if initial is None:
+        initial = solve_greedy(instance)
+    evaluator = PenaltyEvaluator(instance, initial.towers)
+    assert evaluator.valid()
+
+    D = instance.grid_side_length
+    shifts = [offset for offset in disc_offsets(instance.coverage_radius)
+              if offset != (0, 0)]
+    kinds = [kind for kind, _ in _MOVE_WEIGHTS]
+    weights = [weight for _, weight in _MOVE_WEIGHTS]
+
+    stats = AnnealStats()
+    best_total = evaluator.total
+    best_towers = list(evaluator.towers)
+    checkpoint(instance, best_towers)
+    start = time.perf_counter()
+    deadline = start + time_limit
+    temperature = start_temperature
+    ratio = end_temperature / start_temperature
+    last_report = start
+
+    while True:
+        if stats.moves % _CHECK_EVERY == 0:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            temperature = start_temperature * \
+                ratio ** ((now - start) / time_limit)
+            if verbose and now - last_report >= 1.0:
+                last_report = now
+                print(f"anneal: {now - start:.1f}s best {best_total:.3f} "
+                      f"({stats.moves / (now - start):.0f} moves/s)",
+                      file=sys.stderr)
+        stats.moves += 1
+
+        towers = evaluator.towers
+        if not towers:
+            # Only an instance without cities has no towers.
+            break
+        kind = rng.choices(kinds, weights)[0]
+        if not cells and kind in ("add", "jump"):
+            kind = "shift"
+        if kind == "add":
+            move = evaluator.add_tower(rng.choice(cells))
+        elif kind == "remove":
+            move = evaluator.remove_tower(rng.choice(towers))
+        elif kind == "jump":
+            move = evaluator.move_tower(rng.choice(towers), rng.choice(cells))
+        else:
+            tower = rng.choice(towers)
+            dx, dy = rng.choice(shifts)
+            destination = Point(tower.x + dx, tower.y + dy)
+            if not (0 <= destination.x < D and 0 <= destination.y < D):
+                continue
+            move = evaluator.move_tower(tower, destination)
+
+        if move.valid and (move.delta <= 0 or rng.random()
+                           < math.exp(-move.delta / temperature)):
+            evaluator.commit()
+            stats.accepted += 1
+            if evaluator.total < best_total - 1e-9:
+                best_total = evaluator.total
+                best_towers = list(evaluator.towers)
+                checkpoint(instance, best_towers)
+                stats.trace.append((time.perf_counter() - start, best_total))
+        else:
+            evaluator.rollback()
+
+    stats.elapsed = time.perf_counter() - start
+    best = Solution(towers=best_towers, instance=instance)
+    if verbose:
+        print(f"anneal: {stats.moves} moves in {stats.elapsed:.1f}s "
+              f"({stats.moves_per_second:.0f} moves/s), "
+              f"best {best.penalty():.3f}", file=sys.stderr)
+    return best, stats
+
+
+def solve_anneal(instance: Instance, time_limit: float = 10.0, seed: int = 0,
+                 initial: Optional[Solution] = None,
+                 verbose: bool = False) -> Solution:
+    solution, _ = anneal(instance, time_limit=time_limit, seed=seed,
+                         initial=initial, verbose=verbose)
+    return solution
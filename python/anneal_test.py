@@ -0,0 +1,48 @@
+import unittest
+from pathlib import Path
+
+from anneal import anneal, solve_anneal
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+class TestAnneal(unittest.TestCase):
+    def test_no_cities(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[],
+        )
+        self.assertEqual([], solve_anneal(instance, time_limit=0.1).towers)
+
+    @unittest.skipUnless(INPUTS.exists(), "inputs are not available")
+    def test_improves_on_greedy(self):
+        with (INPUTS / "small" / "001.in").open() as f:
+            instance = Instance.parse(f.readlines())
+        greedy = solve_greedy(instance)
+        solution, stats = anneal(instance, time_limit=0.5, seed=170)
+        self.assertTrue(solution.valid())
+        self.assertLessEqual(solution.penalty(), greedy.penalty())
+        self.assertGreater(stats.moves, 0)
+        self.assertGreater(stats.moves_per_second, 0)
+        for (_, first), (_, second) in zip(stats.trace, stats.trace[1:]):
+            self.assertLess(second, first)
+
+    def test_deterministic_moves(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=8, y=8)],
+        )
+        solution, _ = anneal(instance, time_limit=0.2, seed=1)
+        self.assertTrue(solution.valid())
+        self.assertEqual(2, len(solution.towers))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Scores many candidate tower sets for the same instance at once."""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from instance import Instance
+from point import Point
+from solution import Solution
+from stencil import disc_offsets
+import vectorized
+
+np = vectorized.np
+
+# Number of tower sets scored together in one vectorized pass.
+_GROUP_CHUNK = 1024
+
+
+def _row_widths(radius: int) -> List[Tuple[int, int]]:
+    """Returns (dy, w) such that row dy of the disc spans dx in [-w, w]."""
+    widths = {}
+    for dx, dy in disc_offsets(radius):
+        widths[dy] = max(widths.get(dy, 0), dx)
+    return sorted(widths.items())
+
+
+def _score_python(instance: Instance, tower_sets: Sequence[Sequence[Point]]):
+    penalties = array("d")
+    valid = array("B")
+    for towers in tower_sets:
+        solution = Solution(towers=towers, instance=instance)
+        penalties.append(solution.penalty())
+        valid.append(solution.valid())
+    return penalties, valid
+
+
+def _score_numpy(instance: Instance, tower_sets: Sequence[Sequence[Point]]):
+    D = instance.grid_side_length
+    R = instance.penalty_radius
+    W = D + 2 * R
+    G = len(tower_sets)
+
+    lengths = np.array([len(towers) for towers in tower_sets], dtype=np.int64)
+    coords = [vectorized.coords(towers) for towers in tower_sets]
+    xs = np.concatenate([c[0] for c in coords] + [np.empty(0, np.int32)])
+    ys = np.concatenate([c[1] for c in coords] + [np.empty(0, np.int32)])
+    xs = xs.astype(np.int64)
+    ys = ys.astype(np.int64)
+    group = np.repeat(np.arange(G), lengths)
+
+    # Sets with towers out of bounds are rare and invalid anyway; they are
+    # scored one by one so that the keys below can assume in-bounds towers.
+    out_of_bounds = np.zeros(G, dtype=bool)
+    out_of_bounds[group[(xs < 0) | (xs >= D) | (ys < 0) | (ys >= D)]] = True
+    keep = ~out_of_bounds[group]
+    group, xs, ys = group[keep], xs[keep], ys[keep]
+
+    # Give every tower a key that orders towers by set, then by row, then by
+    # column on a grid padded by the penalty radius. The towers of one set
+    # in one row of a tower's penalty disc then form a contiguous key range.
+    keys = group * (W * W) + (ys + R) * W + (xs + R)
+    # Querying with sorted keys keeps the binary searches cache friendly.
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    sorted_counts = np.zeros(len(keys), dtype=np.int64)
+    for dy, w in _row_widths(R):
+        sorted_counts += np.searchsorted(
+            sorted_keys, sorted_keys + dy * W + w, side="right")
+        sorted_counts -= np.searchsorted(
+            sorted_keys, sorted_keys + dy * W - w, side="left")
+    counts = np.empty(len(keys), dtype=np.int64)
+    # Every tower is within range of itself.
+    counts[order] = sorted_counts - 1
+
+    valid = ~out_of_bounds
+    duplicates = sorted_keys[1:][np.diff(sorted_keys) == 0] // (W * W)
+    valid[duplicates] = False
+
+    if len(instance.cities):
+        # Mark the cities each tower covers using the coverage index.
+        index = instance.coverage_index()
+        row_of_cell = np.full(D * D, -1, dtype=np.int64)
+        row_of_cell[np.frombuffer(index.cells, dtype=np.int32)] = \
+            np.arange(len(index))
+        rows = row_of_cell[ys * D + xs]
+        useful = rows >= 0
+        rows = rows[useful]
+        indptr = np.frombuffer(index.indptr, dtype=np.int32).astype(np.int64)
+        starts = indptr[rows]
+        num_covered = indptr[rows + 1] - starts
+        offsets = np.repeat(starts - (np.cumsum(num_covered) - num_covered),
+                            num_covered) + np.arange(num_covered.sum())
+        covered = np.zeros((G, len(instance.cities)), dtype=bool)
+        covered[np.repeat(group[useful], num_covered),
+                np.frombuffer(index.cities, dtype=np.int32)[offsets]] = True
+        valid &= covered.all(axis=1)
+
+    # Sum in tower order, exactly as Solution.penalty() does.
+    weights = [170 * math.exp(0.17 * k)
+               for k in range(int(counts.max(initial=0)) + 1)]
+    counts = counts.tolist()
+    lengths = lengths.tolist()
+    penalties = np.zeros(G, dtype=np.float64)
+    start = 0
+    for g in np.flatnonzero(~out_of_bounds).tolist():
+        penalty = 0
+        for num_overlaps in counts[start:start + lengths[g]]:
+            penalty += weights[num_overlaps]
+        penalties[g] = penalty
+        start += lengths[g]
+
+    for g in np.flatnonzero(out_of_bounds).tolist():
+        penalties[g] = Solution(towers=tower_sets[g], instance=instance).penalty()
+    return penalties, valid
+
+
+def _score_chunk(args):
+    instance, tower_sets = args
+    return score_many(instance, tower_sets)
+
+
+def score_many(instance: Instance, tower_sets: Sequence[Sequence[Point]],
+               processes: Optional[int] = None):
+    """Computes the penalty and validity of every tower set for an instance.
+
+    Returns a pair of arrays (penalties, valid) aligned with tower_sets.
+    These are NumPy arrays when the NumPy backend is enabled, and array.array
+    otherwise. Each penalty is identical to Solution.penalty() on the same
+    towers.
+
+    If processes is given, the tower sets are split into chunks that are
+    scored in a pool of that many worker processes.
+    """
+    if processes is not None and processes > 1 and len(tower_sets) > 1:
+        size = -(-len(tower_sets) // processes)
+        chunks = [(instance, tower_sets[i:i + size])
+                  for i in range(0, len(tower_sets), size)]
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_score_chunk, chunks)
+        if vectorized.ENABLED:
+            return (np.concatenate([r[0] for r in results]),
+                    np.concatenate([r[1] for r in results]))
+        penalties = array("d")
+        valid = array("B")
+        for chunk_penalties, chunk_valid in results:
+            penalties.extend(chunk_penalties)
+            valid.extend(chunk_valid)
+        return penalties, valid
+
+    if not vectorized.ENABLED:
+        return _score_python(instance, tower_sets)
+
+    penalties = []
+    valid = []
+    for start in range(0, len(tower_sets), _GROUP_CHUNK):
+        chunk_penalties, chunk_valid = _score_numpy(
+            instance, tower_sets[start:start + _GROUP_CHUNK])
+        penalties.append(chunk_penalties)
+        valid.append(chunk_valid)
+    if not penalties:
+        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=bool)
+    return np.concatenate(penalties), np.concatenate(valid)
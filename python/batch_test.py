@@ -0,0 +1,58 @@
+import random
+import unittest
+from unittest import mock
+
+from batch import score_many
+from instance import Instance
+from point import Point
+from solution import Solution
+import vectorized
+
+
+def _random_sets(rng, instance, num_sets):
+    tower_sets = []
+    for _ in range(num_sets):
+        towers = [Point(c.x + rng.randint(-2, 2), c.y + rng.randint(-2, 2))
+                  for c in instance.cities if rng.random() < 0.9]
+        tower_sets.append(towers)
+    return tower_sets
+
+
+class TestScoreMany(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(170)
+        cities = list({Point(rng.randrange(30), rng.randrange(30))
+                       for _ in range(20)})
+        self.instance = Instance(30, 3, 8, cities)
+        self.tower_sets = _random_sets(rng, self.instance, 150)
+        self.tower_sets.append([])
+        self.tower_sets.append([Point(0, 0), Point(0, 0)])
+        self.tower_sets.append(list(self.instance.cities))
+
+    def check(self, penalties, valid):
+        self.assertEqual(len(self.tower_sets), len(penalties))
+        self.assertEqual(len(self.tower_sets), len(valid))
+        for towers, penalty, ok in zip(self.tower_sets, penalties, valid):
+            solution = Solution(towers=towers, instance=self.instance)
+            self.assertEqual(solution.penalty(), penalty)
+            self.assertEqual(solution.valid(), bool(ok))
+
+    def test_python(self):
+        with mock.patch.object(vectorized, "ENABLED", False):
+            self.check(*score_many(self.instance, self.tower_sets))
+
+    @unittest.skipUnless(vectorized.np is not None, "NumPy is not installed")
+    def test_numpy(self):
+        self.check(*score_many(self.instance, self.tower_sets))
+
+    def test_processes(self):
+        self.check(*score_many(self.instance, self.tower_sets, processes=2))
+
+    def test_empty(self):
+        penalties, valid = score_many(self.instance, [])
+        self.assertEqual(0, len(penalties))
+        self.assertEqual(0, len(valid))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Micro-benchmarks for the hot paths of validation and scoring.
+
+For usage, run `python3 benchmark.py --help`.
+"""
+
+import argparse
+import statistics
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+def bench_distance(number: int) -> Dict[str, float]:
+    """Times one radius comparison through Distance and through the integer
+    fast path. Returns nanoseconds per comparison."""
+    first = Point(3, 7)
+    second = Point(11, 2)
+    radius = 14
+    radius_sq = radius * radius
+
+    def _distance_obj():
+        return Point.distance_obj(first, second) <= radius
+
+    def _within():
+        return Point.within(first, second, radius_sq)
+
+    results = {}
+    for name, fn in (("distance_obj", _distance_obj), ("within", _within)):
+        seconds = min(timeit.repeat(fn, number=number, repeat=5))
+        results[name] = seconds / number * 1e9
+    return results
+
+
+def bench_greedy(number: int) -> Dict[str, float]:
+    """Times solve_greedy, including the instance reduction it builds, on at
+    most number of the large inputs. Returns nanoseconds per solve."""
+    seconds = []
+    for path in sorted((INPUTS / "large").glob("*.in"))[:number]:
+        with path.open() as f:
+            instance = Instance.parse(f.readlines())
+        start = time.perf_counter()
+        solve_greedy(instance)
+        seconds.append(time.perf_counter() - start)
+    if not seconds:
+        return {}
+    return {"large_median": statistics.median(seconds) * 1e9,
+            "large_max": max(seconds) * 1e9}
+
+
+BENCHMARKS: Dict[str, Callable[[int], Dict[str, float]]] = {
+    "distance": bench_distance,
+    "greedy": bench_greedy,
+}
+
+
+def _format(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.1f} ms"
+    return f"{ns:.1f} ns"
+
+
+def main(args):
+    for name in args.benchmark:
+        for variant, ns in BENCHMARKS[name](args.number).items():
+            print(f"{name}/{variant}: {_format(ns)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks.")
+    parser.add_argument("--benchmark", action="append", type=str,
+                        help="The benchmarks to run. Defaults to all.",
+                        default=None, choices=BENCHMARKS.keys())
+    parser.add_argument("--number", type=int, default=200000,
+                        help="Number of iterations per timing run.")
+    args = parser.parse_args()
+    if args.benchmark is None:
+        args.benchmark = list(BENCHMARKS.keys())
+    main(args)
@@ -0,0 +1,110 @@
+"""Lower bounds on the penalty of any valid solution to an instance."""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, List, Sequence
+
+from instance import Instance
+from point import Point
+
+# Slack for comparing floating point penalties against a bound.
+_EPSILON = 1e-6
+
+
+def _weight(num_overlaps: int) -> float:
+    return 170 * math.exp(0.17 * num_overlaps)
+
+
+def pack_cities(instance: Instance, order: Iterable[int]) -> List[int]:
+    """Greedily picks cities, in the given order, that share no candidate
+    tower cell with any city picked before. No tower covers two picked
+    cities, so every valid solution has a separate tower for each of them.
+    """
+    index = instance.coverage_index()
+    used = set()
+    packed = []
+    for city in order:
+        rows = index.covering(city)
+        if used.isdisjoint(rows):
+            used.update(rows)
+            packed.append(city)
+    return packed
+
+
+def forced_penalty(instance: Instance, packed: Sequence[Point],
+                   towers: Sequence[Point] = (),
+                   overlaps: Sequence[int] = ()) -> float:
+    """Returns a lower bound on the penalty added by one new tower for each
+    packed city, on top of existing towers with the given overlap counts.
+
+    A tower covering city p is within the penalty radius of every tower at
+    most R_p - R_s from p, and of the tower of every other packed city at
+    most R_p - 2 R_s from p. Those overlaps are unavoidable. The penalty of a
+    tower is convex in its overlap count, so each existing tower gains at
+    least as much as if its forced overlaps were added one at a time.
+
+    >>> instance = Instance(grid_side_length=10, coverage_radius=1,
+    ...                     penalty_radius=4, cities=[])
+    >>> round(forced_penalty(instance, [Point(1, 1), Point(3, 1)]), 3)
+    403.004
+    """
+    R_s = instance.coverage_radius
+    R_p = instance.penalty_radius
+    tower_reach_sq = (R_p - R_s) ** 2 if R_p >= R_s else -1
+    city_reach_sq = (R_p - 2 * R_s) ** 2 if R_p >= 2 * R_s else -1
+
+    gained = [0] * len(towers)
+    penalty = 0.0
+    for i, city in enumerate(packed):
+        forced = 0
+        for slot, tower in enumerate(towers):
+            if Point.within(city, tower, tower_reach_sq):
+                forced += 1
+                gained[slot] += 1
+        for j, other in enumerate(packed):
+            if j != i and Point.within(city, other, city_reach_sq):
+                forced += 1
+        penalty += _weight(forced)
+    for count, num_overlaps in zip(gained, overlaps):
+        if count:
+            penalty += _weight(num_overlaps + count) - _weight(num_overlaps)
+    return penalty
+
+
+def lower_bound(instance: Instance) -> float:
+    """Returns a lower bound on the penalty of any valid solution.
+
+    Cities are packed greedily in a few orders, hardest to cover first, and
+    the best bound from forced_penalty() among those packings is returned.
+
+    >>> instance = Instance(grid_side_length=10, coverage_radius=1,
+    ...                     penalty_radius=2,
+    ...                     cities=[Point(1, 1), Point(3, 1), Point(8, 8)])
+    >>> lower_bound(instance)
+    340.0
+    """
+    index = instance.coverage_index()
+    cities = instance.cities
+    by_candidates = sorted(range(len(cities)),
+                           key=lambda city: len(index.covering(city)))
+    orders = (
+        by_candidates,
+        sorted(range(len(cities)), key=lambda city: (cities[city].y, cities[city].x)),
+        range(len(cities)),
+    )
+    best = 0.0
+    for order in orders:
+        packed = [cities[city] for city in pack_cities(instance, order)]
+        best = max(best, forced_penalty(instance, packed))
+    return best
+
+
+def optimality_gap(instance: Instance, penalty: float) -> float:
+    """Returns how far a penalty may be above the optimum."""
+    return max(penalty - lower_bound(instance), 0.0)
+
+
+def is_optimal(instance: Instance, penalty: float) -> bool:
+    """Returns whether a penalty is provably optimal for the instance."""
+    return optimality_gap(instance, penalty) <= _EPSILON
@@ -0,0 +1,73 @@
+import math
+import unittest
+from pathlib import Path
+
+from bounds import forced_penalty, is_optimal, lower_bound, pack_cities
+from exact import branch_and_bound
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+class TestBounds(unittest.TestCase):
+    def setUp(self):
+        self.instance = Instance(
+            grid_side_length=8,
+            coverage_radius=1,
+            penalty_radius=3,
+            cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=6, y=2),
+                    Point(x=2, y=5), Point(x=6, y=6)],
+        )
+
+    def test_pack_cities(self):
+        index = self.instance.coverage_index()
+        packed = pack_cities(self.instance, range(len(self.instance.cities)))
+        # Cities 0 and 1 can share a tower at (2, 1).
+        self.assertEqual([0, 2, 3, 4], packed)
+        for i in packed:
+            for j in packed:
+                if i != j:
+                    self.assertFalse(set(index.covering(i)) & set(index.covering(j)))
+
+    def test_forced_penalty_with_towers(self):
+        instance = Instance(grid_side_length=10, coverage_radius=1,
+                            penalty_radius=3, cities=[])
+        # The tower for (1, 1) must be within 3 of (2, 2), which gains an
+        # overlap on top of its one existing overlap.
+        penalty = forced_penalty(instance, [Point(1, 1)],
+                                 towers=[Point(2, 2), Point(9, 9)],
+                                 overlaps=[1, 0])
+        expected = 170 * math.exp(0.17) \
+            + 170 * math.exp(0.34) - 170 * math.exp(0.17)
+        self.assertAlmostEqual(expected, penalty)
+
+    def test_below_optimum(self):
+        result = branch_and_bound(self.instance)
+        self.assertTrue(result.optimal)
+        bound = lower_bound(self.instance)
+        self.assertLessEqual(bound, result.penalty + 1e-9)
+        self.assertGreaterEqual(bound, 4 * 170)
+
+    def test_is_optimal(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1)],
+        )
+        self.assertTrue(is_optimal(instance, 170))
+        self.assertFalse(is_optimal(instance, 340))
+
+    @unittest.skipUnless(INPUTS.exists(), "inputs are not available")
+    def test_below_greedy(self):
+        for size in ("small", "medium", "large"):
+            with (INPUTS / size / "001.in").open() as f:
+                instance = Instance.parse(f.readlines())
+            self.assertLessEqual(lower_bound(instance),
+                                 solve_greedy(instance).penalty())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+from point import Point
+from stencil import disc_offsets, points_in_disc
+
+
+class CoverageIndex:
+    """Maps grid cells to the cities a tower placed there would cover.
+
+    Only cells that cover at least one city are stored. Cells are identified
+    by their packed id y * D + x and by their row in the index. The forward
+    table (row -> covered city ids) and the reverse table (city id -> rows of
+    the cells covering it) are stored in compressed sparse row form.
+
+    >>> index = CoverageIndex(10, 1, [Point(0, 0), Point(2, 0)])
+    >>> [index.cell_point(row) for row in index.covering(1)]
+    [Point(x=2, y=0), Point(x=1, y=0), Point(x=3, y=0), Point(x=2, y=1)]
+    >>> list(index.lookup(Point(1, 0)))
+    [0, 1]
+    """
+
+    def __init__(self, grid_side_length: int, coverage_radius: int,
+                 cities: Sequence[Point]):
+        self.grid_side_length = grid_side_length
+        D = grid_side_length
+        covered: Dict[int, List[int]] = defaultdict(list)
+        for city_id, city in enumerate(cities):
+            for cell in points_in_disc(city, disc_offsets(coverage_radius), D):
+                covered[cell.y * D + cell.x].append(city_id)
+
+        self.cells = array("i", sorted(covered))
+        self.indptr = array("i", [0])
+        self.cities = array("i")
+        self._rows: Dict[int, int] = {}
+        for row, cell in enumerate(self.cells):
+            self._rows[cell] = row
+            self.cities.extend(covered[cell])
+            self.indptr.append(len(self.cities))
+
+        covering: List[List[int]] = [[] for _ in cities]
+        for row in range(len(self.cells)):
+            for city_id in self.covered(row):
+                covering[city_id].append(row)
+        # Order each city's cells by distance so that closer cells come first.
+        for city_id, rows in enumerate(covering):
+            rows.sort(key=lambda row: (
+                Point.distance_sq(cities[city_id], self.cell_point(row)), row))
+        self.city_indptr = array("i", [0])
+        self.city_cells = array("i")
+        for rows in covering:
+            self.city_cells.extend(rows)
+            self.city_indptr.append(len(self.city_cells))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def cell_point(self, row: int) -> Point:
+        """Returns the grid point of the cell at the given row."""
+        cell = self.cells[row]
+        return Point(x=cell % self.grid_side_length,
+                     y=cell // self.grid_side_length)
+
+    def row(self, point: Point) -> int:
+        """Returns the row of the cell at the given point, or -1 if a tower
+        there would not cover any city."""
+        if not (0 <= point.x < self.grid_side_length
+                and 0 <= point.y < self.grid_side_length):
+            return -1
+        return self.cell_row(point.y * self.grid_side_length + point.x)
+
+    def cell_row(self, cell: int) -> int:
+        """Returns the row of the cell with the given packed id, or -1 if a
+        tower there would not cover any city."""
+        return self._rows.get(cell, -1)
+
+    def covered(self, row: int) -> Sequence[int]:
+        """Returns the ids of the cities covered by the cell at the given
+        row."""
+        return self.cities[self.indptr[row]:self.indptr[row + 1]]
+
+    def covering(self, city_id: int) -> Sequence[int]:
+        """Returns the rows of the cells covering the given city, closest
+        first."""
+        return self.city_cells[self.city_indptr[city_id]:self.city_indptr[city_id + 1]]
+
+    def lookup(self, point: Point) -> Sequence[int]:
+        """Returns the ids of the cities a tower at the given point covers."""
+        row = self.row(point)
+        if row < 0:
+            return ()
+        return self.covered(row)
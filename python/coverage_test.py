@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from coverage import CoverageIndex
+from instance import Instance
+from point import Point
+
+
+class TestCoverageIndex(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(170)
+        cities = list({Point(rng.randrange(30), rng.randrange(30))
+                       for _ in range(25)})
+        index = CoverageIndex(30, 3, cities)
+
+        num_cells = 0
+        for x in range(30):
+            for y in range(30):
+                want = [i for i, city in enumerate(cities)
+                        if Point.distance_sq(city, Point(x, y)) <= 9]
+                self.assertEqual(want, sorted(index.lookup(Point(x, y))))
+                num_cells += bool(want)
+        self.assertEqual(num_cells, len(index))
+
+        for city_id, city in enumerate(cities):
+            rows = index.covering(city_id)
+            points = [index.cell_point(row) for row in rows]
+            self.assertTrue(all(Point.distance_sq(city, p) <= 9
+                                for p in points))
+            for row in rows:
+                self.assertIn(city_id, index.covered(row))
+            self.assertEqual(city, points[0])
+
+    def test_clipped_to_grid(self):
+        index = CoverageIndex(10, 1, [Point(0, 0)])
+        self.assertEqual(3, len(index))
+        self.assertEqual(-1, index.row(Point(-1, 0)))
+        self.assertEqual((), index.lookup(Point(-1, 0)))
+        self.assertEqual((), index.lookup(Point(5, 5)))
+
+    def test_instance_caches_index(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=9, y=0)],
+        )
+        self.assertIs(instance.coverage_index(), instance.coverage_index())
+        self.assertEqual(
+            instance,
+            Instance(
+                grid_side_length=10,
+                coverage_radius=1,
+                penalty_radius=2,
+                cities=[Point(x=9, y=0)],
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
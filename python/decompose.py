@@ -0,0 +1,62 @@
+"""Solves instances one independent component at a time."""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+from typing import Callable, List, Optional, Sequence
+
+from exact import branch_and_bound
+from greedy import solve_greedy
+from instance import Instance
+from solution import Solution
+
+# Components with at most this many cities are solved exactly by default.
+EXACT_MAX_CITIES = 12
+
+
+def combine(instance: Instance, parts: Sequence[Solution]) -> Solution:
+    """Joins solutions of the components of an instance into one solution.
+
+    The components are independent, so the penalty of the result is the sum
+    of the penalties of the parts.
+    """
+    towers = []
+    for part in parts:
+        towers.extend(part.towers)
+    return Solution(towers=towers, instance=instance)
+
+
+def _solve_part(args) -> Solution:
+    part, solver, exact_max_cities, deadline = args
+    if len(part.cities) <= exact_max_cities:
+        time_limit = None if deadline is None \
+            else max(deadline - time.time(), 0.0)
+        return branch_and_bound(part, time_limit=time_limit).solution
+    return solver(part)
+
+
+def solve_decomposed(instance: Instance,
+                     solver: Callable[[Instance], Solution] = solve_greedy,
+                     exact_max_cities: int = EXACT_MAX_CITIES,
+                     time_limit: Optional[float] = None,
+                     processes: Optional[int] = None) -> Solution:
+    """Solves every component of instance.decompose() separately.
+
+    Components with at most exact_max_cities cities are solved by branch and
+    bound, and the others by solver. If time_limit is given, branch and
+    bound gets whatever is left of time_limit seconds from the start, and
+    falls back to the greedy solution once none is left. If processes is
+    given, the components are solved in a pool of that many worker
+    processes, in which case solver must be picklable.
+    """
+    parts = instance.decompose()
+    # Wall-clock time, as the deadline is shared by worker processes.
+    deadline = None if time_limit is None else time.time() + time_limit
+    jobs = [(part, solver, exact_max_cities, deadline) for part in parts]
+    if processes is not None and processes > 1 and len(parts) > 1:
+        with multiprocessing.Pool(processes) as pool:
+            solutions: List[Solution] = pool.map(_solve_part, jobs)
+    else:
+        solutions = [_solve_part(job) for job in jobs]
+    return combine(instance, solutions)
@@ -0,0 +1,67 @@
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import decompose
+from decompose import combine, solve_decomposed
+from exact import branch_and_bound
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+def _clusters():
+    return Instance(
+        grid_side_length=30,
+        coverage_radius=1,
+        penalty_radius=3,
+        cities=[Point(x=1, y=1), Point(x=20, y=20), Point(x=3, y=1),
+                Point(x=22, y=21), Point(x=2, y=25)],
+    )
+
+
+class TestDecompose(unittest.TestCase):
+    def test_combine_adds_penalties(self):
+        instance = _clusters()
+        parts = [solve_greedy(part) for part in instance.decompose()]
+        solution = combine(instance, parts)
+        self.assertTrue(solution.valid())
+        self.assertAlmostEqual(sum(part.penalty() for part in parts),
+                               solution.penalty())
+
+    def test_matches_exact(self):
+        instance = _clusters()
+        self.assertEqual(3, len(instance.decompose()))
+        solution = solve_decomposed(instance)
+        self.assertTrue(solution.valid())
+        self.assertAlmostEqual(branch_and_bound(instance).penalty,
+                               solution.penalty())
+
+    def test_processes(self):
+        instance = _clusters()
+        self.assertEqual(solve_decomposed(instance).towers,
+                         solve_decomposed(instance, processes=2).towers)
+
+    def test_time_limit_is_shared(self):
+        with mock.patch.object(decompose, "branch_and_bound",
+                               wraps=branch_and_bound) as solve:
+            solution = solve_decomposed(_clusters(), time_limit=5)
+        self.assertTrue(solution.valid())
+        # Each component only gets what the earlier ones left.
+        limits = [call.kwargs["time_limit"] for call in solve.call_args_list]
+        self.assertEqual(3, len(limits))
+        self.assertEqual(sorted(limits, reverse=True), limits)
+        self.assertLessEqual(limits[0], 5)
+
+    @unittest.skipUnless(INPUTS.exists(), "inputs are not available")
+    def test_large_instance(self):
+        with (INPUTS / "large" / "001.in").open() as f:
+            instance = Instance.parse(f.readlines())
+        solution = solve_decomposed(instance)
+        self.assertTrue(solution.valid())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from instance import Instance
+from point import Point
+from solution import Solution
+
+
+@dataclasses.dataclass(frozen=True)
+class Move:
+    """A pending change to the towers tracked by a PenaltyEvaluator.
+
+    delta is the change in penalty the move would cause and valid is whether
+    the solution would be valid after the move.
+    """
+    removed: Optional[Point]
+    added: Optional[Point]
+    delta: float
+    valid: bool
+
+
+class PenaltyEvaluator:
+    """Incrementally tracks the penalty and validity of a set of towers.
+
+    Each tower keeps a count of the other towers within the penalty radius,
+    and each city keeps a count of the towers covering it. add_tower,
+    remove_tower and move_tower only look at the neighborhood of the towers
+    involved; they return a Move describing the outcome, which is applied
+    with commit() or discarded with rollback().
+
+    >>> instance = Instance(10, 1, 2, [Point(0, 0)])
+    >>> evaluator = PenaltyEvaluator(instance, [Point(0, 1)])
+    >>> move = evaluator.add_tower(Point(0, 2))
+    >>> round(move.delta, 6), move.valid
+    (233.003649, True)
+    >>> evaluator.rollback()
+    >>> evaluator.towers
+    [Point(x=0, y=1)]
+    """
+
+    def __init__(self, instance: Instance, towers: Iterable[Point] = ()):
+        self.instance = instance
+        self.towers: List[Point] = []
+        self.overlaps: List[int] = []
+        self.coverage: List[int] = [0] * len(instance.cities)
+        self.num_uncovered = len(instance.cities)
+        self.total = 0.0
+
+        self._radius_sq = instance.penalty_radius ** 2
+        self._cell_size = max(instance.penalty_radius, 1)
+        self._buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._occupancy: Dict[Point, int] = defaultdict(int)
+        self._num_duplicates = 0
+        self._num_out_of_bounds = 0
+        self._coverage = instance.coverage_index()
+        self._weights: List[float] = []
+        self._pending: Optional[Move] = None
+
+        for tower in towers:
+            self._apply(None, tower)
+
+    def _weight(self, num_overlaps: int) -> float:
+        while len(self._weights) <= num_overlaps:
+            self._weights.append(170 * math.exp(0.17 * len(self._weights)))
+        return self._weights[num_overlaps]
+
+    def _key(self, point: Point) -> Tuple[int, int]:
+        return (point.x // self._cell_size, point.y // self._cell_size)
+
+    def _neighbors(self, point: Point, exclude: Optional[int] = None) -> List[int]:
+        # Towers are sparse, so the 3x3 buckets hold far fewer towers than
+        # the hundreds of cells of instance.penalty_offsets() for the large
+        # size; scanning that stencil instead is about ten times slower.
+        bx, by = self._key(point)
+        x, y = point.x, point.y
+        radius_sq = self._radius_sq
+        towers = self.towers
+        buckets = self._buckets
+        found = []
+        for cx in (bx - 1, bx, bx + 1):
+            for cy in (by - 1, by, by + 1):
+                for slot in buckets.get((cx, cy), ()):
+                    if slot == exclude:
+                        continue
+                    # Point.within, inlined as this is the hottest loop.
+                    tower = towers[slot]
+                    dx = tower.x - x
+                    dy = tower.y - y
+                    if dx * dx + dy * dy <= radius_sq:
+                        found.append(slot)
+        return found
+
+    def _covered_cities(self, point: Point) -> Sequence[int]:
+        return self._coverage.lookup(point)
+
+    def _in_bounds(self, point: Point) -> bool:
+        side = self.instance.grid_side_length
+        return 0 <= point.x < side and 0 <= point.y < side
+
+    def _slot(self, tower: Point) -> int:
+        for slot in self._buckets.get(self._key(tower), ()):
+            if self.towers[slot] == tower:
+                return slot
+        raise ValueError(f"{tower} is not a tower")
+
+    def _evaluate(self, removed: Optional[Point], added: Optional[Point]) -> Move:
+        delta = 0.0
+        num_uncovered = self.num_uncovered
+        num_duplicates = self._num_duplicates
+        num_out_of_bounds = self._num_out_of_bounds
+        removed_slot = None
+        lost: List[int] = []
+
+        if removed is not None:
+            removed_slot = self._slot(removed)
+            delta -= self._weight(self.overlaps[removed_slot])
+            for slot in self._neighbors(removed, exclude=removed_slot):
+                count = self.overlaps[slot]
+                delta += self._weight(count - 1) - self._weight(count)
+            lost = [c for c in self._covered_cities(removed)
+                    if self.coverage[c] == 1]
+            if self._occupancy[removed] > 1:
+                num_duplicates -= 1
+            if not self._in_bounds(removed):
+                num_out_of_bounds -= 1
+
+        if added is not None:
+            neighbors = self._neighbors(added, exclude=removed_slot)
+            delta += self._weight(len(neighbors))
+            for slot in neighbors:
+                count = self.overlaps[slot]
+                if removed is not None:
+                    dx = self.towers[slot].x - removed.x
+                    dy = self.towers[slot].y - removed.y
+                    if dx * dx + dy * dy <= self._radius_sq:
+                        count -= 1
+                delta += self._weight(count + 1) - self._weight(count)
+            gained = set(self._covered_cities(added))
+            lost = [c for c in lost if c not in gained]
+            num_uncovered -= sum(1 for c in gained if self.coverage[c] == 0)
+            occupancy = self._occupancy[added] - (added == removed)
+            if occupancy > 0:
+                num_duplicates += 1
+            if not self._in_bounds(added):
+                num_out_of_bounds += 1
+
+        num_uncovered += len(lost)
+        valid = num_uncovered == 0 and num_duplicates == 0 \
+            and num_out_of_bounds == 0
+        return Move(removed=removed, added=added, delta=delta, valid=valid)
+
+    def _apply(self, removed: Optional[Point], added: Optional[Point]) -> None:
+        if removed is not None:
+            slot = self._slot(removed)
+            self.total -= self._weight(self.overlaps[slot])
+            for other in self._neighbors(removed, exclude=slot):
+                count = self.overlaps[other]
+                self.total += self._weight(count - 1) - self._weight(count)
+                self.overlaps[other] = count - 1
+            for city in self._covered_cities(removed):
+                self.coverage[city] -= 1
+                if self.coverage[city] == 0:
+                    self.num_uncovered += 1
+            self._occupancy[removed] -= 1
+            if self._occupancy[removed] > 0:
+                self._num_duplicates -= 1
+            if not self._in_bounds(removed):
+                self._num_out_of_bounds -= 1
+
+            # Swap the last tower into the freed slot to keep removal O(1).
+            last = len(self.towers) - 1
+            self._buckets[self._key(removed)].remove(slot)
+            if slot != last:
+                moved = self.towers[last]
+                bucket = self._buckets[self._key(moved)]
+                bucket[bucket.index(last)] = slot
+                self.towers[slot] = moved
+                self.overlaps[slot] = self.overlaps[last]
+            self.towers.pop()
+            self.overlaps.pop()
+
+        if added is not None:
+            neighbors = self._neighbors(added)
+            for other in neighbors:
+                count = self.overlaps[other]
+                self.total += self._weight(count + 1) - self._weight(count)
+                self.overlaps[other] = count + 1
+            self.total += self._weight(len(neighbors))
+            for city in self._covered_cities(added):
+                if self.coverage[city] == 0:
+                    self.num_uncovered -= 1
+                self.coverage[city] += 1
+            if self._occupancy[added] > 0:
+                self._num_duplicates += 1
+            self._occupancy[added] += 1
+            if not self._in_bounds(added):
+                self._num_out_of_bounds += 1
+
+            self._buckets[self._key(added)].append(len(self.towers))
+            self.towers.append(added)
+            self.overlaps.append(len(neighbors))
+
+    def add_delta(self, tower: Point) -> float:
+        """Returns the penalty change of adding a tower, without checking
+        validity or creating a pending move."""
+        # _neighbors, fused with the sum as greedy calls this for every
+        # candidate it rescores. No overlap count exceeds the tower count.
+        self._weight(len(self.towers) + 1)
+        weights = self._weights
+        overlaps = self.overlaps
+        towers = self.towers
+        buckets = self._buckets
+        radius_sq = self._radius_sq
+        bx, by = self._key(tower)
+        x, y = tower.x, tower.y
+        delta = 0.0
+        num_neighbors = 0
+        for cx in (bx - 1, bx, bx + 1):
+            for cy in (by - 1, by, by + 1):
+                for slot in buckets.get((cx, cy), ()):
+                    other = towers[slot]
+                    dx = other.x - x
+                    dy = other.y - y
+                    if dx * dx + dy * dy <= radius_sq:
+                        count = overlaps[slot]
+                        delta += weights[count + 1] - weights[count]
+                        num_neighbors += 1
+        return delta + weights[num_neighbors]
+
+    def add_tower(self, tower: Point) -> Move:
+        """Evaluates adding a tower. The move is pending until committed."""
+        self._pending = self._evaluate(None, tower)
+        return self._pending
+
+    def remove_tower(self, tower: Point) -> Move:
+        """Evaluates removing a tower. The move is pending until committed."""
+        self._pending = self._evaluate(tower, None)
+        return self._pending
+
+    def move_tower(self, tower: Point, destination: Point) -> Move:
+        """Evaluates moving a tower. The move is pending until committed."""
+        self._pending = self._evaluate(tower, destination)
+        return self._pending
+
+    def commit(self) -> None:
+        """Applies the pending move."""
+        assert self._pending is not None, "no pending move"
+        self._apply(self._pending.removed, self._pending.added)
+        self._pending = None
+
+    def rollback(self) -> None:
+        """Discards the pending move."""
+        self._pending = None
+
+    def penalty(self) -> float:
+        """Computes the penalty from the tracked overlap counts.
+
+        The terms are summed in tower order, so the result is identical to
+        Solution.penalty() on the same towers. The running total in
+        self.total may differ from it by floating point rounding.
+        """
+        penalty = 0
+        for num_overlaps in self.overlaps:
+            penalty += 170 * math.exp(0.17 * num_overlaps)
+        return penalty
+
+    def valid(self) -> bool:
+        """Determines whether the tracked towers form a valid solution."""
+        return self.num_uncovered == 0 and self._num_duplicates == 0 \
+            and self._num_out_of_bounds == 0
+
+    def solution(self) -> Solution:
+        return Solution(towers=list(self.towers), instance=self.instance)
@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from evaluator import PenaltyEvaluator
+from instance import Instance
+from point import Point
+from solution import Solution
+
+
+def _random_instance(rng, num_cities=40):
+    cities = set()
+    while len(cities) < num_cities:
+        cities.add(Point(rng.randrange(30), rng.randrange(30)))
+    return Instance(
+        grid_side_length=30,
+        coverage_radius=3,
+        penalty_radius=8,
+        cities=sorted(cities, key=lambda p: (p.x, p.y)),
+    )
+
+
+class TestPenaltyEvaluator(unittest.TestCase):
+    def assert_matches_solution(self, evaluator):
+        solution = Solution(towers=list(evaluator.towers),
+                            instance=evaluator.instance)
+        self.assertEqual(solution.penalty(), evaluator.penalty())
+        self.assertAlmostEqual(solution.penalty(), evaluator.total, places=6)
+        self.assertEqual(solution.valid(), evaluator.valid())
+
+    def test_initial_state(self):
+        instance = Instance(10, 1, 2, [Point(9, 0)])
+        towers = [Point(0, 0), Point(0, 1), Point(0, 2),
+                  Point(5, 5), Point(5, 6), Point(9, 9)]
+        evaluator = PenaltyEvaluator(instance, towers)
+        self.assertAlmostEqual(1289.52692064, evaluator.penalty())
+        self.assertFalse(evaluator.valid())
+        self.assertEqual([2, 2, 2, 1, 1, 0], evaluator.overlaps)
+
+    def test_rollback_keeps_state(self):
+        instance = Instance(10, 1, 2, [Point(9, 0)])
+        evaluator = PenaltyEvaluator(instance, [Point(9, 1)])
+        move = evaluator.remove_tower(Point(9, 1))
+        self.assertFalse(move.valid)
+        self.assertAlmostEqual(-170, move.delta)
+        evaluator.rollback()
+        self.assertEqual([Point(9, 1)], evaluator.towers)
+        self.assertTrue(evaluator.valid())
+
+    def test_commit_without_pending(self):
+        evaluator = PenaltyEvaluator(Instance(10, 1, 2, []))
+        with self.assertRaises(AssertionError):
+            evaluator.commit()
+
+    def test_remove_missing_tower(self):
+        evaluator = PenaltyEvaluator(Instance(10, 1, 2, []))
+        with self.assertRaises(ValueError):
+            evaluator.remove_tower(Point(1, 1))
+
+    def test_duplicates_and_out_of_bounds(self):
+        instance = Instance(10, 1, 2, [Point(0, 0)])
+        evaluator = PenaltyEvaluator(instance, [Point(0, 0)])
+        self.assertFalse(evaluator.add_tower(Point(0, 0)).valid)
+        evaluator.commit()
+        self.assert_matches_solution(evaluator)
+        self.assertTrue(evaluator.remove_tower(Point(0, 0)).valid)
+        self.assertFalse(evaluator.move_tower(Point(0, 0), Point(10, 0)).valid)
+        evaluator.commit()
+        self.assert_matches_solution(evaluator)
+
+    def test_random_moves_match_solution(self):
+        rng = random.Random(170)
+        instance = _random_instance(rng)
+        evaluator = PenaltyEvaluator(instance, instance.cities[:10])
+        self.assert_matches_solution(evaluator)
+        for _ in range(500):
+            kind = rng.randrange(3)
+            target = Point(rng.randrange(31), rng.randrange(31))
+            if kind == 0 or not evaluator.towers:
+                move = evaluator.add_tower(target)
+            elif kind == 1:
+                move = evaluator.remove_tower(rng.choice(evaluator.towers))
+            else:
+                move = evaluator.move_tower(
+                    rng.choice(evaluator.towers), target)
+
+            before = Solution(towers=list(evaluator.towers),
+                              instance=instance).penalty()
+            if rng.random() < 0.5:
+                evaluator.rollback()
+                self.assertEqual(before, evaluator.penalty())
+                continue
+            evaluator.commit()
+            after = Solution(towers=list(evaluator.towers), instance=instance)
+            self.assertAlmostEqual(after.penalty() - before, move.delta,
+                                   places=6)
+            self.assertEqual(after.valid(), move.valid)
+            self.assert_matches_solution(evaluator)
+
+
+if __name__ == "__main__":
+    unittest.main()
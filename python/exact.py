@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+import sys
+import time
+from typing import Collection, List, Optional, Sequence, Set
+
+import bounds
+from evaluator import PenaltyEvaluator
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+from solution import Solution
+
+# Number of nodes between clock reads.
+_CHECK_EVERY = 64
+
+# Slack for the floating point running penalty of the evaluator.
+_EPSILON = 1e-6
+
+
+@dataclasses.dataclass
+class ExactResult:
+    solution: Solution
+    penalty: float
+    lower_bound: float
+    nodes: int
+    optimal: bool
+
+    @property
+    def gap(self) -> float:
+        return max(self.penalty - self.lower_bound, 0.0)
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class _Search:
+    def __init__(self, instance: Instance, fixed: Sequence[Point],
+                 allowed: Optional[Collection[int]], incumbent: Solution,
+                 node_limit: Optional[int], time_limit: Optional[float]):
+        self.instance = instance
+        self.index = instance.coverage_index()
+        self.evaluator = PenaltyEvaluator(instance, fixed)
+        self.allowed = allowed
+        self.best_towers: List[Point] = list(incumbent.towers)
+        self.best = incumbent.penalty()
+        self.nodes = 0
+        self.node_limit = node_limit
+        self.deadline = None if time_limit is None \
+            else time.perf_counter() + time_limit
+        # Lowest bound among the nodes left unexplored when the budget ran
+        # out.
+        self.open_bound = math.inf
+
+    def _candidates(self, city: int, forbidden: Set[int]) -> List[int]:
+        return [row for row in self.index.covering(city)
+                if row not in forbidden
+                and (self.allowed is None or row in self.allowed)]
+
+    def _packing(self, uncovered: List[int], forbidden: Set[int],
+                 skip: Set[int]) -> Optional[List[int]]:
+        """Greedily picks uncovered cities whose candidate cells are pairwise
+        disjoint and also disjoint from skip, so that each needs its own new
+        tower. Returns None if some city has no candidates left."""
+        used = set(skip)
+        packed = []
+        for city in uncovered:
+            rows = self._candidates(city, forbidden)
+            if not rows:
+                return None
+            if used.isdisjoint(rows):
+                used.update(rows)
+                packed.append(city)
+        return packed
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise _BudgetExhausted
+        if self.deadline is not None and self.nodes % _CHECK_EVERY == 0 \
+                and time.perf_counter() > self.deadline:
+            raise _BudgetExhausted
+
+    def search(self, forbidden: Set[int]) -> None:
+        evaluator = self.evaluator
+        uncovered = [city for city, count in enumerate(evaluator.coverage)
+                     if count == 0]
+        if not uncovered:
+            penalty = evaluator.penalty()
+            if penalty < self.best:
+                self.best = penalty
+                self.best_towers = list(evaluator.towers)
+            return
+
+        city = uncovered[0]
+        rows = self._candidates(city, forbidden)
+        if not rows:
+            return
+        packed = self._packing(uncovered, forbidden, set())
+        if packed is None:
+            return
+        cities = self.instance.cities
+        bound = evaluator.total + bounds.forced_penalty(
+            self.instance, [cities[p] for p in packed], evaluator.towers,
+            evaluator.overlaps)
+        if bound >= self.best - _EPSILON:
+            return
+        # A cheaper bound for each child: its tower, plus 170 for every other
+        # city that needs its own tower.
+        others = self._packing(uncovered[1:], forbidden, set(rows))
+
+        deltas = {row: evaluator.add_delta(self.index.cell_point(row))
+                  for row in rows}
+        rows.sort(key=lambda row: deltas[row] / len(self.index.covered(row)))
+        child_forbidden = set(forbidden)
+        try:
+            for row in rows:
+                if evaluator.total + deltas[row] + 170 * len(others) \
+                        >= self.best - _EPSILON:
+                    child_forbidden.add(row)
+                    continue
+                self._tick()
+                tower = self.index.cell_point(row)
+                evaluator.add_tower(tower)
+                evaluator.commit()
+                try:
+                    self.search(child_forbidden)
+                finally:
+                    evaluator.remove_tower(tower)
+                    evaluator.commit()
+                # Later siblings need not consider this cell again.
+                child_forbidden.add(row)
+        except _BudgetExhausted:
+            self.open_bound = min(self.open_bound, bound)
+            raise
+
+
+def branch_and_bound(instance: Instance, node_limit: Optional[int] = None,
+                     time_limit: Optional[float] = None,
+                     fixed: Sequence[Point] = (),
+                     allowed: Optional[Collection[int]] = None,
+                     incumbent: Optional[Solution] = None) -> ExactResult:
+    """Finds a minimum penalty solution by branch and bound.
+
+    Each node branches on the cells that could cover the lowest-indexed
+    uncovered city; the i-th branch forbids the cells of the earlier
+    branches so that no tower set is visited twice. A node is pruned when
+    its penalty so far, plus the overlaps forced on a set of uncovered cities
+    that each need a tower of their own, reaches the incumbent.
+
+    fixed towers are always part of the solution, and allowed, if given,
+    restricts new towers to those coverage index rows. If the node or time
+    budget runs out, the incumbent is returned together with a lower bound
+    on the optimum. An incumbent, which must contain the fixed towers, is
+    required when there are fixed towers; otherwise it defaults to the greedy
+    solution. Without fixed towers or allowed rows, the search starts from
+    the forced towers and candidate cells of instance.reduction().
+    """
+    unrestricted = not fixed and allowed is None
+    if incumbent is None:
+        assert not fixed, "an incumbent is required with fixed towers"
+        incumbent = solve_greedy(instance)
+    if unrestricted:
+        reduction = instance.reduction()
+        fixed = reduction.forced
+        allowed = set(reduction.candidates)
+    search = _Search(instance, fixed, allowed, incumbent, node_limit,
+                     time_limit)
+    optimal = True
+    try:
+        search.search(set())
+    except _BudgetExhausted:
+        optimal = False
+
+    solution = Solution(towers=search.best_towers, instance=instance)
+    if optimal:
+        lower_bound = search.best
+    else:
+        lower_bound = min(search.best, search.open_bound)
+        if unrestricted:
+            lower_bound = min(search.best,
+                              max(lower_bound, bounds.lower_bound(instance)))
+    return ExactResult(
+        solution=solution,
+        penalty=search.best,
+        lower_bound=lower_bound,
+        nodes=search.nodes,
+        optimal=optimal,
+    )
+
+
+def solve_exact(instance: Instance, time_limit: float = 60.0,
+                node_limit: Optional[int] = None,
+                initial: Optional[Solution] = None,
+                verbose: bool = False) -> Solution:
+    result = branch_and_bound(instance, node_limit=node_limit,
+                              time_limit=time_limit, incumbent=initial)
+    if verbose:
+        status = "optimal" if result.optimal else f"gap {result.gap:.3f}"
+        print(f"exact: {result.nodes} nodes, penalty {result.penalty:.3f} "
+              f"({status})", file=sys.stderr)
+    return result.solution
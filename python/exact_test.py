@@ -0,0 +1,87 @@
+import itertools
+import unittest
+
+from exact import branch_and_bound, solve_exact
+from instance import Instance
+from point import Point
+from solution import Solution
+
+
+def _instance():
+    return Instance(
+        grid_side_length=8,
+        coverage_radius=1,
+        penalty_radius=3,
+        cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=6, y=2),
+                Point(x=2, y=5), Point(x=6, y=6)],
+    )
+
+
+def _brute_force(instance):
+    index = instance.coverage_index()
+    best = float("inf")
+    for k in range(1, len(instance.cities) + 1):
+        for rows in itertools.combinations(range(len(index)), k):
+            covered = set()
+            for row in rows:
+                covered.update(index.covered(row))
+            if len(covered) < len(instance.cities):
+                continue
+            towers = [index.cell_point(row) for row in rows]
+            best = min(best, Solution(towers=towers, instance=instance).penalty())
+    return best
+
+
+class TestBranchAndBound(unittest.TestCase):
+    def test_matches_brute_force(self):
+        instance = _instance()
+        result = branch_and_bound(instance)
+        self.assertTrue(result.optimal)
+        self.assertTrue(result.solution.valid())
+        self.assertAlmostEqual(_brute_force(instance), result.penalty)
+        self.assertAlmostEqual(result.solution.penalty(), result.penalty)
+        self.assertEqual(0.0, result.gap)
+
+    def test_shared_tower(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1)],
+        )
+        result = branch_and_bound(instance)
+        self.assertEqual([Point(x=2, y=1)], result.solution.towers)
+        self.assertEqual(170, result.penalty)
+
+    def test_node_limit(self):
+        instance = _instance()
+        naive = Solution(towers=list(instance.cities), instance=instance)
+        result = branch_and_bound(instance, node_limit=0, incumbent=naive)
+        self.assertFalse(result.optimal)
+        self.assertTrue(result.solution.valid())
+        self.assertEqual(naive.penalty(), result.penalty)
+        self.assertLessEqual(result.lower_bound, result.penalty)
+        self.assertLessEqual(result.lower_bound, _brute_force(instance) + 1e-9)
+
+    def test_fixed_and_allowed(self):
+        instance = _instance()
+        index = instance.coverage_index()
+        fixed = [Point(x=6, y=6)]
+        # New towers may only go on the cities themselves.
+        allowed = {index.row(city) for city in instance.cities}
+        incumbent = Solution(towers=list(instance.cities), instance=instance)
+        result = branch_and_bound(instance, fixed=fixed, allowed=allowed,
+                                  incumbent=incumbent)
+        self.assertTrue(result.optimal)
+        self.assertIn(Point(x=6, y=6), result.solution.towers)
+        for tower in result.solution.towers:
+            self.assertIn(tower, instance.cities)
+        self.assertLessEqual(result.penalty, incumbent.penalty())
+
+    def test_solve_exact(self):
+        instance = _instance()
+        self.assertTrue(solve_exact(instance, time_limit=10).valid())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import heapq
+from typing import List, Tuple
+
+from evaluator import PenaltyEvaluator
+from instance import Instance
+from solution import Solution
+
+
+def _ratio(evaluator: PenaltyEvaluator, covered: List[bool],
+           row: int) -> Tuple[float, int]:
+    """Returns the penalty increase per newly covered city of placing a tower
+    at the given coverage index row, and the number of newly covered cities.
+    """
+    index = evaluator.instance.coverage_index()
+    gain = sum(1 for city in index.covered(row) if not covered[city])
+    if gain == 0:
+        return float("inf"), 0
+    return evaluator.add_delta(index.cell_point(row)) / gain, gain
+
+
+def prune_redundant(evaluator: PenaltyEvaluator) -> None:
+    """Removes towers whose cities are all covered by other towers, most
+    overlapped first. Removing a tower never increases the penalty."""
+    order = sorted(range(len(evaluator.towers)),
+                   key=lambda i: -evaluator.overlaps[i])
+    for tower in [evaluator.towers[i] for i in order]:
+        move = evaluator.remove_tower(tower)
+        if move.valid:
+            evaluator.commit()
+        else:
+            evaluator.rollback()
+
+
+def solve_greedy(instance: Instance) -> Solution:
+    """Covers the cities greedily, always placing the tower with the smallest
+    penalty increase per newly covered city.
+
+    Adding towers only ever increases a candidate's penalty increase and
+    decreases the cities it would newly cover, so a candidate's ratio never
+    improves. The candidates therefore sit in a lazily updated heap: the top
+    is re-scored when popped and placed only if it still beats the next one.
+    Only the towers and candidate cells of instance.reduction() are used.
+    """
+    index = instance.coverage_index()
+    reduction = instance.reduction()
+    evaluator = PenaltyEvaluator(instance, reduction.forced)
+    covered = [count > 0 for count in evaluator.coverage]
+    num_uncovered = evaluator.num_uncovered
+
+    heap = []
+    for row in reduction.candidates:
+        ratio, gain = _ratio(evaluator, covered, row)
+        heap.append((ratio, -gain, row))
+    heapq.heapify(heap)
+
+    while num_uncovered and heap:
+        _, _, row = heapq.heappop(heap)
+        ratio, gain = _ratio(evaluator, covered, row)
+        if gain == 0:
+            continue
+        if heap and (ratio, -gain, row) > heap[0]:
+            heapq.heappush(heap, (ratio, -gain, row))
+            continue
+
+        evaluator.add_tower(index.cell_point(row))
+        evaluator.commit()
+        for city in index.covered(row):
+            if not covered[city]:
+                covered[city] = True
+                num_uncovered -= 1
+
+    prune_redundant(evaluator)
+    return evaluator.solution()
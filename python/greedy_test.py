@@ -0,0 +1,44 @@
+import unittest
+from pathlib import Path
+
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+from solution import Solution
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+class TestSolveGreedy(unittest.TestCase):
+    def test_shared_tower(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1)],
+        )
+        solution = solve_greedy(instance)
+        self.assertEqual([Point(x=2, y=1)], solution.towers)
+
+    def test_no_cities(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[],
+        )
+        self.assertEqual([], solve_greedy(instance).towers)
+
+    @unittest.skipUnless(INPUTS.exists(), "inputs are not available")
+    def test_beats_naive(self):
+        for size in ("small", "medium", "large"):
+            with (INPUTS / size / "001.in").open() as f:
+                instance = Instance.parse(f.readlines())
+            solution = solve_greedy(instance)
+            self.assertTrue(solution.valid())
+            naive = Solution(towers=instance.cities, instance=instance)
+            self.assertLess(solution.penalty(), naive.penalty())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,269 @@
+"""Keeps a history of solver runs in an SQLite database.
+
+To list the best recorded solution of every instance, or how each solver
+fares, run
+
+`python3 python/history.py history.db best`
+`python3 python/history.py history.db solvers`
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from instance import Instance
+from size import Size
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+# Slack for deciding which runs tie for the best penalty.
+_EPSILON = 1e-6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    instance_hash TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    size TEXT NOT NULL,
+    solver TEXT NOT NULL,
+    params TEXT NOT NULL,
+    seed INTEGER,
+    penalty REAL,
+    valid INTEGER NOT NULL,
+    wall_seconds REAL,
+    cpu_seconds REAL,
+    peak_memory_kb INTEGER,
+    output TEXT,
+    output_digest TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_instance ON runs (instance_hash, penalty);
+CREATE INDEX IF NOT EXISTS runs_solver ON runs (solver);
+"""
+
+# Columns added to the runs table since it was first created.
+_ADDED_COLUMNS = (("output", "TEXT"), ("output_digest", "TEXT"))
+
+# Runs without an output are all distinct, as NULLs never collide.
+_OUTPUT_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS runs_output
+ON runs (instance_hash, output, output_digest);
+"""
+
+
+@dataclasses.dataclass
+class RunRecord:
+    # Which tool recorded the run: solve, solve_all or merge.
+    source: str
+    # SHA-256 of the input file, so renamed inputs keep their history.
+    instance_hash: str
+    # The input's <size>/<name>, for display.
+    instance: str
+    size: str
+    solver: str
+    params: Dict[str, Any]
+    seed: Optional[int]
+    # None if the run failed.
+    penalty: Optional[float]
+    valid: bool
+    wall_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    # Peak resident set size of the solving process, see measure().
+    peak_memory_kb: Optional[int] = None
+    # The output file that was scored, and the SHA-256 of its contents.
+    # A run is recorded once per instance, output and digest.
+    output: Optional[str] = None
+    output_digest: Optional[str] = None
+
+
+@dataclasses.dataclass
+class Usage:
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_memory_kb: Optional[int] = None
+
+
+def _cpu_seconds() -> float:
+    # Includes finished child processes, such as portfolio workers.
+    times = os.times()
+    return times.user + times.system + times.children_user \
+        + times.children_system
+
+
+def _reset_peak_memory() -> bool:
+    """Resets the peak resident set size of this process, which only Linux
+    allows. Returns whether it did."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _peak_memory_kb(since_reset: bool) -> Optional[int]:
+    if since_reset:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            pass
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return None
+
+
+@contextlib.contextmanager
+def measure() -> Iterator[Usage]:
+    """Measures the wall and CPU time of the block, and the peak memory of
+    this process during it. Where the peak cannot be reset, as outside of
+    Linux, the peak since the process started is reported instead, which
+    for a pool worker covers all of its earlier jobs. The returned Usage is
+    filled in on exit."""
+    usage = Usage()
+    reset = _reset_peak_memory()
+    wall = time.perf_counter()
+    cpu = _cpu_seconds()
+    try:
+        yield usage
+    finally:
+        usage.wall_seconds = time.perf_counter() - wall
+        usage.cpu_seconds = _cpu_seconds() - cpu
+        usage.peak_memory_kb = _peak_memory_kb(reset)
+
+
+def instance_name(inf: Path) -> str:
+    """Returns the <size>/<name> of an input file."""
+    return f"{Path(inf).parent.name}/{Path(inf).stem}"
+
+
+def size_class(instance: Instance) -> str:
+    """Returns the name of the size class of an instance, or "other"."""
+    for name in ("small", "medium", "large"):
+        if getattr(Size, name.upper()).instance_has_size(instance):
+            return name
+    return "other"
+
+
+# Number of runs that batch writers buffer before storing them.
+BATCH_SIZE = 100
+
+
+class History:
+    """An SQLite database of RunRecords."""
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+            columns = {row["name"] for row in self.connection.execute(
+                "PRAGMA table_info(runs)")}
+            for name, kind in _ADDED_COLUMNS:
+                if name not in columns:
+                    self.connection.execute(
+                        f"ALTER TABLE runs ADD COLUMN {name} {kind}")
+            self.connection.executescript(_OUTPUT_INDEX)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> History:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def record(self, runs: Iterable[RunRecord]) -> None:
+        """Stores the runs in a single transaction, skipping runs of outputs
+        whose contents were already recorded for the instance."""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO runs (recorded_at, source, "
+                "instance_hash, instance, size, solver, params, seed, "
+                "penalty, valid, wall_seconds, cpu_seconds, peak_memory_kb, "
+                "output, output_digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(now, run.source, run.instance_hash, run.instance, run.size,
+                  run.solver, json.dumps(run.params, sort_keys=True),
+                  run.seed, run.penalty, int(run.valid), run.wall_seconds,
+                  run.cpu_seconds, run.peak_memory_kb, run.output,
+                  run.output_digest)
+                 for run in runs])
+
+    def best_per_instance(self, size: Optional[str] = None) -> List[sqlite3.Row]:
+        """Returns the best valid run of every instance, ordered by name."""
+        return self.connection.execute(
+            "SELECT instance, size, solver, params, seed, MIN(penalty) AS "
+            "penalty, wall_seconds FROM runs WHERE valid AND penalty IS NOT "
+            "NULL AND (? IS NULL OR size = ?) GROUP BY instance_hash "
+            "ORDER BY instance", (size, size)).fetchall()
+
+    def solver_summary(self, size: Optional[str] = None) -> List[sqlite3.Row]:
+        """Returns, per solver, its number of runs and valid runs, the number
+        of instances on which it matched the best penalty recorded by any
+        solver, and its mean wall and CPU time."""
+        return self.connection.execute(
+            "WITH best AS (SELECT instance_hash, MIN(penalty) AS penalty "
+            "FROM runs WHERE valid GROUP BY instance_hash) "
+            "SELECT solver, COUNT(*) AS runs, SUM(valid) AS valid_runs, "
+            "COUNT(DISTINCT CASE WHEN runs.valid AND runs.penalty <= "
+            "best.penalty + ? THEN runs.instance_hash END) AS wins, "
+            "AVG(wall_seconds) AS mean_wall, AVG(cpu_seconds) AS mean_cpu "
+            "FROM runs LEFT JOIN best USING (instance_hash) "
+            "WHERE (? IS NULL OR size = ?) "
+            "GROUP BY solver ORDER BY wins DESC, solver",
+            (_EPSILON, size, size)).fetchall()
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return "-" if value is None else str(value)
+
+
+def _print_rows(rows: List[sqlite3.Row]) -> None:
+    if not rows:
+        print("No runs recorded.")
+        return
+    print("\t".join(rows[0].keys()))
+    for row in rows:
+        print("\t".join(_format(value) for value in row))
+
+
+def main(args):
+    with History(args.database) as history:
+        if args.query == "best":
+            _print_rows(history.best_per_instance(args.size))
+        else:
+            _print_rows(history.solver_summary(args.size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Queries the history of solver runs.")
+    parser.add_argument("database", type=str,
+                        help="Path to the history database.")
+    parser.add_argument("query", choices=("best", "solvers"),
+                        help="best: the best run of every instance. "
+                        "solvers: runs, wins and mean runtimes per solver.")
+    parser.add_argument("--size", type=str, default=None,
+                        choices=("small", "medium", "large"),
+                        help="Only consider instances of this size.")
+    main(parser.parse_args())
@@ -0,0 +1,117 @@
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from history import History, RunRecord, instance_name, measure
+
+
+def _run(instance, solver, penalty, valid=True, size="small"):
+    return RunRecord(source="solve", instance_hash=f"hash-{instance}",
+                     instance=instance, size=size, solver=solver,
+                     params={"time_limit": 1.0}, seed=0, penalty=penalty,
+                     valid=valid, wall_seconds=1.0, cpu_seconds=0.5)
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "history.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        with History(self.path) as history:
+            history.record([_run("small/001", "greedy", 2000.0)])
+        # Reopening keeps the runs and does not recreate the table.
+        with History(self.path) as history:
+            history.record([_run("small/001", "anneal", 1900.0)])
+            rows = history.connection.execute(
+                "SELECT solver, params, penalty FROM runs ORDER BY id"
+            ).fetchall()
+        self.assertEqual([("greedy", '{"time_limit": 1.0}', 2000.0),
+                          ("anneal", '{"time_limit": 1.0}', 1900.0)],
+                         [tuple(row) for row in rows])
+
+    def test_outputs_are_recorded_once(self):
+        run = _run("small/001", "a", 2000.0)
+        run.output, run.output_digest = "a/small/001.out", "digest"
+        with History(self.path) as history:
+            history.record([run, run])
+            history.record([run])
+            run.output_digest = "changed"
+            history.record([run])
+            # Runs without an output are never deduplicated.
+            history.record([_run("small/001", "a", 2000.0)] * 2)
+            count = history.connection.execute(
+                "SELECT COUNT(*) FROM runs").fetchone()[0]
+        self.assertEqual(4, count)
+
+    def test_adds_columns_to_old_databases(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            "CREATE TABLE runs (id INTEGER PRIMARY KEY, recorded_at REAL, "
+            "source TEXT, instance_hash TEXT, instance TEXT, size TEXT, "
+            "solver TEXT, params TEXT, seed INTEGER, penalty REAL, "
+            "valid INTEGER, wall_seconds REAL, cpu_seconds REAL, "
+            "peak_memory_kb INTEGER)")
+        connection.close()
+        with History(self.path) as history:
+            history.record([_run("small/001", "a", 2000.0)])
+            self.assertEqual(1, len(history.best_per_instance()))
+
+    def test_best_per_instance(self):
+        with History(self.path) as history:
+            history.record([
+                _run("small/001", "greedy", 2000.0),
+                _run("small/001", "anneal", 1900.0),
+                _run("small/001", "broken", 100.0, valid=False),
+                _run("small/002", "greedy", None, valid=False),
+                _run("large/001", "greedy", 9000.0, size="large"),
+            ])
+            best = history.best_per_instance()
+            self.assertEqual([("large/001", "greedy", 9000.0),
+                              ("small/001", "anneal", 1900.0)],
+                             [(row["instance"], row["solver"], row["penalty"])
+                              for row in best])
+            self.assertEqual(["large/001"], [
+                row["instance"] for row in history.best_per_instance("large")])
+
+    def test_solver_summary(self):
+        with History(self.path) as history:
+            history.record([
+                _run("small/001", "greedy", 2000.0),
+                _run("small/001", "anneal", 1900.0),
+                _run("small/002", "greedy", 1500.0),
+                _run("small/002", "anneal", 1500.0),
+                _run("small/003", "anneal", None, valid=False),
+            ])
+            summary = {row["solver"]: (row["runs"], row["valid_runs"],
+                                       row["wins"])
+                       for row in history.solver_summary()}
+        self.assertEqual({"anneal": (3, 2, 2), "greedy": (2, 2, 1)}, summary)
+
+    def test_instance_name(self):
+        self.assertEqual("small/001",
+                         instance_name(Path("inputs/small/001.in")))
+
+    def test_measure(self):
+        with measure() as usage:
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+        self.assertGreaterEqual(usage.wall_seconds, 0.05)
+        self.assertGreater(usage.cpu_seconds, 0.0)
+
+    def test_measure_peak_memory(self):
+        with measure() as usage:
+            data = b"x" * (64 << 20)
+        del data
+        if usage.peak_memory_kb is not None:
+            self.assertGreaterEqual(usage.peak_memory_kb, 64 << 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import Iterable, Iterator, List, TYPE_CHECKING
+from typing import Iterable, Iterator, List, Optional, TYPE_CHECKING
 
 import parse
+from coverage import CoverageIndex
 from point import Point
+from point_array import PointArray, coords
+from reduction import Reduction, reduce_instance
+from spatial import SpatialHash
+from stencil import Offsets, disc_offsets
 from svg import SVGGraphic
 
 if TYPE_CHECKING:
@@ -22,6 +27,10 @@ class Instance:
     coverage_radius: int
     penalty_radius: int
     cities: List[Point]
+    _coverage_index: Optional[CoverageIndex] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False)
+    _reduction: Optional[Reduction] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False)
 
     @property
     def N(self):
@@ -39,6 +48,88 @@ class Instance:
     def D(self):
         return self.grid_side_length
 
+    @property
+    def coverage_offsets(self) -> Offsets:
+        """The (dx, dy) offsets of the grid cells a tower covers."""
+        return disc_offsets(self.coverage_radius)
+
+    @property
+    def penalty_offsets(self) -> Offsets:
+        """The (dx, dy) offsets of the grid cells a tower penalizes."""
+        return disc_offsets(self.penalty_radius)
+
+    def coverage_index(self) -> CoverageIndex:
+        """Returns the index from tower cells to the cities they cover.
+
+        The index is built on first use and cached, so the cities must not be
+        modified afterwards.
+        """
+        if self._coverage_index is None:
+            self._coverage_index = CoverageIndex(
+                self.grid_side_length, self.coverage_radius, self.cities)
+        return self._coverage_index
+
+    def reduction(self) -> Reduction:
+        """Returns the candidate tower cells left after removing dominated
+        cells, and the towers forced by them. See reduce_instance().
+
+        The reduction is computed on first use and cached, like the coverage
+        index.
+        """
+        if self._reduction is None:
+            self._reduction = reduce_instance(self)
+        return self._reduction
+
+    def decompose(self) -> List[Instance]:
+        """Splits the instance into sub-instances that can be solved
+        independently.
+
+        Cities more than R_p + 2 R_s apart can neither share a tower nor have
+        towers within penalty range of each other. The sub-instances are the
+        connected components of the graph joining all closer pairs of cities,
+        so the union of their optimal solutions is optimal for the instance
+        and its penalty is the sum of theirs. Components are ordered by their
+        first city, and the instance itself is returned when it does not
+        split.
+
+        >>> instance = Instance(grid_side_length=30, coverage_radius=1,
+        ...                     penalty_radius=2, cities=[
+        ...                         Point(1, 1), Point(20, 20), Point(5, 1)])
+        >>> [list(part.cities) for part in instance.decompose()]
+        [[Point(x=1, y=1), Point(x=5, y=1)], [Point(x=20, y=20)]]
+        """
+        reach = self.penalty_radius + 2 * self.coverage_radius
+        reach_sq = reach * reach
+        cities = self.cities
+        parent = list(range(len(cities)))
+
+        def _find(city: int) -> int:
+            while parent[city] != city:
+                parent[city] = parent[parent[city]]
+                city = parent[city]
+            return city
+
+        index = SpatialHash(cities, reach)
+        for city, point in enumerate(cities):
+            for other in index.candidates(point):
+                if other < city and Point.within(point, cities[other], reach_sq):
+                    parent[_find(city)] = _find(other)
+
+        components = {}
+        for city in range(len(cities)):
+            components.setdefault(_find(city), []).append(city)
+        if len(components) <= 1:
+            return [self]
+        return [
+            Instance(
+                grid_side_length=self.grid_side_length,
+                coverage_radius=self.coverage_radius,
+                penalty_radius=self.penalty_radius,
+                cities=PointArray(cities[city] for city in members),
+            )
+            for members in components.values()
+        ]
+
     def valid(self):
         """Determines whether the problem instance is valid.
 
@@ -46,12 +137,13 @@ class Instance:
         are no duplicate cities.
         """
 
-        for city in self.cities:
-            if not 0 <= city.x < self.grid_side_length:
-                return False
-            if not 0 <= city.y < self.grid_side_length:
-                return False
-        return len(set(self.cities)) == len(self.cities)
+        D = self.grid_side_length
+        xs, ys = coords(self.cities)
+        if xs and not (0 <= min(xs) and max(xs) < D and
+                       0 <= min(ys) and max(ys) < D):
+            return False
+        # All cities are in bounds, so packed keys identify them uniquely.
+        return len({y * D + x for x, y in zip(xs, ys)}) == len(xs)
 
     @staticmethod
     def parse(lines: Iterable[str]) -> Instance:
@@ -61,7 +153,7 @@ class Instance:
         coverage_radius = _next_int(lines_iter)
         penalty_radius = _next_int(lines_iter)
 
-        cities = [Point.parse(line) for line in lines_iter]
+        cities = PointArray(Point.parse(line) for line in lines_iter)
         assert num_cities == len(cities)
 
         instance = Instance(
@@ -73,6 +165,32 @@ class Instance:
         assert instance.valid()
         return instance
 
+    @staticmethod
+    def parse_bytes(data: bytes, strict: bool = False) -> Instance:
+        """Parses the contents of an input file. Unless strict, all numbers
+        are converted in one pass, so numbers split across lines differently
+        than the format prescribes are accepted.
+
+        >>> Instance.parse_bytes(b"1\\n10\\n1\\n2\\n3 4\\n").cities[0]
+        Point(x=3, y=4)
+        """
+        if strict:
+            return Instance.parse(data.decode().splitlines())
+        values = parse.read_ints(data)
+        assert len(values) >= 4
+        num_cities, grid_side_length, coverage_radius, penalty_radius = \
+            values[:4]
+        assert len(values) == 4 + 2 * num_cities
+
+        instance = Instance(
+            grid_side_length=grid_side_length,
+            coverage_radius=coverage_radius,
+            penalty_radius=penalty_radius,
+            cities=PointArray.from_coords(values[4::2], values[5::2]),
+        )
+        assert instance.valid()
+        return instance
+
     def serialize(self, out) -> None:
         print(len(self.cities), file=out)
         print(self.grid_side_length, file=out)
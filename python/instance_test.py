@@ -103,6 +103,34 @@ class TestParseInstance(unittest.TestCase):
             Instance.parse(lines)
 
 
+class TestParseInstanceBytes(unittest.TestCase):
+    DATA = b"# Comment\n3\n10\n1\n2\n1 2\n# 9 9\n3 4\n5 6\n"
+
+    def test_matches_parse(self):
+        lines = self.DATA.decode().splitlines()
+        self.assertEqual(Instance.parse(lines), Instance.parse_bytes(self.DATA))
+        self.assertEqual(Instance.parse(lines),
+                         Instance.parse_bytes(self.DATA, strict=True))
+
+    def test_wrong_count(self):
+        for data in (b"3\n10\n1\n2\n1 2\n3 4\n", b"1\n10\n1\n",
+                     b"1\n10\n1\n2\n1 2 3\n"):
+            with self.assertRaises(AssertionError):
+                Instance.parse_bytes(data)
+
+    def test_invalid(self):
+        with self.assertRaises(AssertionError):
+            Instance.parse_bytes(b"2\n10\n1\n2\n1 2\n1 2\n")
+        with self.assertRaises(ValueError):
+            Instance.parse_bytes(b"1\n10\n1\n2\n1 x\n")
+
+    def test_strict_checks_lines(self):
+        data = b"1\n10\n1\n2\n1\n2\n"
+        self.assertEqual([Point(x=1, y=2)], Instance.parse_bytes(data).cities)
+        with self.assertRaises(AssertionError):
+            Instance.parse_bytes(data, strict=True)
+
+
 class TestInstance(unittest.TestCase):
     def test_invalid_oob(self):
         instance = Instance(
@@ -134,6 +162,39 @@ class TestInstance(unittest.TestCase):
         )
         self.assertFalse(instance.valid())
 
+    def test_decompose(self):
+        instance = Instance(
+            grid_side_length=20,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[
+                Point(x=0, y=0),
+                Point(x=10, y=10),
+                # Exactly R_p + 2 R_s away from the first city.
+                Point(x=4, y=0),
+                Point(x=15, y=10),
+            ],
+        )
+        parts = instance.decompose()
+        self.assertEqual(
+            [[Point(x=0, y=0), Point(x=4, y=0)],
+             [Point(x=10, y=10)],
+             [Point(x=15, y=10)]],
+            [list(part.cities) for part in parts])
+        for part in parts:
+            self.assertEqual(20, part.grid_side_length)
+            self.assertEqual(1, part.coverage_radius)
+            self.assertEqual(2, part.penalty_radius)
+
+    def test_decompose_connected(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1)],
+        )
+        self.assertEqual([instance], instance.decompose())
+
 
 class TestInstanceSerialization(unittest.TestCase):
     def test_serialize(self):
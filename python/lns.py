@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import dataclasses
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from exact import branch_and_bound
+from greedy import solve_greedy
+from instance import Instance
+from solution import Solution
+from watchdog import checkpoint
+
+# Slack for comparing floating point penalties.
+_EPSILON = 1e-9
+
+
+@dataclasses.dataclass
+class LNSStats:
+    iterations: int = 0
+    improvements: int = 0
+    # Repairs that ran out of time before proving their window optimal.
+    timeouts: int = 0
+    elapsed: float = 0.0
+    # Half side length of the window after every iteration.
+    windows: List[int] = dataclasses.field(default_factory=list)
+    # (seconds since start, best penalty) every time the best improves.
+    trace: List[Tuple[float, float]] = dataclasses.field(default_factory=list)
+
+
+def lns(instance: Instance, time_limit: float = 10.0, seed: int = 0,
+        repair_time: float = 0.25, initial: Optional[Solution] = None,
+        verbose: bool = False) -> Tuple[Solution, LNSStats]:
+    """Runs large neighborhood search for time_limit seconds.
+
+    Each iteration centers a square window on a random tower, removes the
+    towers inside it and re-solves the window by branch and bound, with the
+    towers outside kept fixed so that their overlaps with the new towers are
+    charged. The repair is kept if it lowers the penalty.
+
+    The window grows while repairs are proven optimal within a quarter of
+    repair_time and shrinks when a repair runs out of time, so the window
+    size follows what the exact solver can handle on the instance.
+    """
+    rng = random.Random(seed)
+    index = instance.coverage_index()
+    reduction = instance.reduction()
+    rows = sorted(reduction.candidates
+                  + [index.row(tower) for tower in reduction.forced])
+    if initial is None:
+        initial = solve_greedy(instance)
+    assert initial.valid()
+
+    D = instance.grid_side_length
+    min_window = instance.coverage_radius
+    window = 2 * instance.coverage_radius
+    stats = LNSStats()
+    current = Solution(towers=list(initial.towers), instance=instance)
+    current_penalty = current.penalty()
+    checkpoint(instance, current.towers)
+    start = time.perf_counter()
+    deadline = start + time_limit
+
+    while current.towers:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        stats.iterations += 1
+
+        center = rng.choice(current.towers)
+        x_lo, x_hi = center.x - window, center.x + window
+        y_lo, y_hi = center.y - window, center.y + window
+
+        def _inside(x: int, y: int) -> bool:
+            return x_lo <= x <= x_hi and y_lo <= y <= y_hi
+
+        fixed = [tower for tower in current.towers
+                 if not _inside(tower.x, tower.y)]
+        allowed = {row for row in rows
+                   if _inside(index.cells[row] % D, index.cells[row] // D)}
+        result = branch_and_bound(
+            instance, time_limit=min(repair_time, deadline - now),
+            fixed=fixed, allowed=allowed, incumbent=current)
+        elapsed = time.perf_counter() - now
+
+        if result.penalty < current_penalty - _EPSILON:
+            current = result.solution
+            checkpoint(instance, current.towers)
+            current_penalty = result.penalty
+            stats.improvements += 1
+            stats.trace.append((time.perf_counter() - start, current_penalty))
+            if verbose:
+                print(f"lns: {time.perf_counter() - start:.1f}s penalty "
+                      f"{current_penalty:.3f} (window {2 * window + 1})",
+                      file=sys.stderr)
+
+        if not result.optimal:
+            stats.timeouts += 1
+            window = max(window - 1, min_window)
+        elif elapsed < repair_time / 4 and window < D:
+            window += 1
+        stats.windows.append(window)
+
+    stats.elapsed = time.perf_counter() - start
+    if verbose:
+        print(f"lns: {stats.iterations} iterations, {stats.improvements} "
+              f"improvements in {stats.elapsed:.1f}s, penalty "
+              f"{current_penalty:.3f}", file=sys.stderr)
+    return current, stats
+
+
+def solve_lns(instance: Instance, time_limit: float = 10.0, seed: int = 0,
+              initial: Optional[Solution] = None,
+              verbose: bool = False) -> Solution:
+    solution, _ = lns(instance, time_limit=time_limit, seed=seed,
+                      initial=initial, verbose=verbose)
+    return solution
@@ -0,0 +1,51 @@
+import unittest
+from pathlib import Path
+
+from greedy import solve_greedy
+from instance import Instance
+from lns import lns, solve_lns
+from point import Point
+from solution import Solution
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+class TestLNS(unittest.TestCase):
+    def test_no_cities(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[],
+        )
+        self.assertEqual([], solve_lns(instance, time_limit=0.1).towers)
+
+    def test_repairs_window(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=8, y=8)],
+        )
+        # One tower per city; the first two cities can share a tower.
+        initial = Solution(towers=list(instance.cities), instance=instance)
+        solution, stats = lns(instance, time_limit=0.5, initial=initial)
+        self.assertTrue(solution.valid())
+        self.assertEqual(340, solution.penalty())
+        self.assertGreater(stats.improvements, 0)
+        self.assertEqual(stats.iterations, len(stats.windows))
+
+    @unittest.skipUnless(INPUTS.exists(), "inputs are not available")
+    def test_improves_on_greedy(self):
+        with (INPUTS / "medium" / "001.in").open() as f:
+            instance = Instance.parse(f.readlines())
+        greedy = solve_greedy(instance)
+        solution, stats = lns(instance, time_limit=2, seed=1)
+        self.assertTrue(solution.valid())
+        self.assertLessEqual(solution.penalty(), greedy.penalty())
+        for (_, first), (_, second) in zip(stats.trace, stats.trace[1:]):
+            self.assertLess(second, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Records which inputs an output folder holds up-to-date solutions for."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+MANIFEST_NAME = "manifest.json"
+
+# Where merge.py records the outputs it has already ranked.
+MERGE_MANIFEST_NAME = "merge_manifest.json"
+
+Manifest = Dict[str, Dict[str, Any]]
+
+
+def file_digest(path: Path) -> str:
+    """Returns the SHA-256 of a file's contents."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def file_stamp(path: Path) -> List[int]:
+    """Returns the modification time in nanoseconds and the size of a file,
+    which change whenever the file is rewritten."""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def job_key(inf: Path, solver: str, version: int,
+            params: Dict[str, Any]) -> str:
+    """Returns a digest of the input file contents, the solver name and
+    version, and its parameters. An output is up to date while the key it
+    was solved under stays the same."""
+    digest = hashlib.sha256()
+    digest.update(Path(inf).read_bytes())
+    digest.update(json.dumps([solver, version, params], sort_keys=True)
+                  .encode())
+    return digest.hexdigest()
+
+
+def load_manifest(outroot: Path, name: str = MANIFEST_NAME) -> Manifest:
+    """Returns the manifest of an output folder, or an empty one if there is
+    none or it cannot be read."""
+    try:
+        with (Path(outroot) / name).open() as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Replaces the file at path with text, so that an interrupted write
+    leaves either the old or the new contents."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def save_manifest(outroot: Path, manifest: Manifest,
+                  name: str = MANIFEST_NAME) -> None:
+    write_atomic(Path(outroot) / name,
+                 json.dumps(manifest, indent=1, sort_keys=True))
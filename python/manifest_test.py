@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from manifest import (MANIFEST_NAME, job_key, load_manifest, save_manifest,
+                      write_atomic)
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_job_key(self):
+        inf = self.root / "001.in"
+        inf.write_text("1\n10\n1\n2\n0 0\n")
+        key = job_key(inf, "greedy", 1, {"time_limit": 1.0})
+        self.assertEqual(key, job_key(inf, "greedy", 1, {"time_limit": 1.0}))
+        self.assertNotEqual(key, job_key(inf, "anneal", 1, {"time_limit": 1.0}))
+        self.assertNotEqual(key, job_key(inf, "greedy", 2, {"time_limit": 1.0}))
+        self.assertNotEqual(key, job_key(inf, "greedy", 1, {"time_limit": 2.0}))
+        inf.write_text("1\n10\n1\n2\n0 1\n")
+        self.assertNotEqual(key, job_key(inf, "greedy", 1, {"time_limit": 1.0}))
+
+    def test_round_trip(self):
+        self.assertEqual({}, load_manifest(self.root))
+        manifest = {"small/001": {"key": "abc", "penalty": 170.0}}
+        save_manifest(self.root, manifest)
+        self.assertEqual(manifest, load_manifest(self.root))
+        self.assertEqual([MANIFEST_NAME],
+                         [path.name for path in self.root.iterdir()])
+
+    def test_corrupt(self):
+        (self.root / MANIFEST_NAME).write_text('{"small/001": ')
+        self.assertEqual({}, load_manifest(self.root))
+
+    def test_write_atomic(self):
+        path = self.root / "001.out"
+        write_atomic(path, "1\n0 0\n")
+        write_atomic(path, "1\n1 1\n")
+        self.assertEqual("1\n1 1\n", path.read_text())
+        self.assertEqual(["001.out"], [p.name for p in self.root.iterdir()])
+
+
+if __name__ == "__main__":
+    unittest.main()
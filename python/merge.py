@@ -12,14 +12,24 @@ in the root directory.
 
 
 import argparse
+import dataclasses
 import enum
 import multiprocessing
 import os
+import time
 from pathlib import Path
 from threading import BoundedSemaphore
+from typing import Any, Dict, Iterable, List, Optional
 
+import parse
+from bounds import lower_bound
+from history import BATCH_SIZE, History, RunRecord, instance_name, size_class
 from instance import Instance
+from manifest import (MERGE_MANIFEST_NAME, file_digest, file_stamp,
+                      load_manifest, save_manifest)
+from schedule import estimate_costs, largest_first, makespan_report
 from solution import Solution
+from warm_start import load_solution
 
 
 def removesuffix(s: str, suffix: str):
@@ -44,40 +54,239 @@ class Size(enum.Enum):
     LARGE = "large"
 
 
+def output_records(inf: Path, instance: Instance, scored):
+    """Describes each (output file, penalty) pair for the --history
+    database. The solver of an output is the name of its output folder.
+    Outputs keep their digest, so that merging them again records nothing."""
+    instance_hash = file_digest(inf)
+    return [RunRecord(
+        source="merge",
+        instance_hash=instance_hash,
+        instance=instance_name(inf),
+        size=size_class(instance),
+        solver=outf.parent.parent.name,
+        params={"output": str(outf.parent.parent)},
+        seed=None,
+        penalty=penalty,
+        valid=True,
+        output=str(outf.resolve()),
+        output_digest=file_digest(outf),
+    ) for outf, penalty in scored]
+
+
+def recorded_penalty(outf: Path, indexed: Optional[float]) -> Optional[float]:
+    """Returns the penalty in the header of an output, else the penalty that
+    its output folder's manifest records, else None."""
+    with outf.open('r') as f:
+        header = parse.penalty_header(f)
+    return indexed if header is None else header
+
+
+def score(outf: Path, instance: Instance) -> Solution:
+    return Solution.parse_bytes(outf.read_bytes(), instance)
+
+
+@dataclasses.dataclass
+class Candidate:
+    penalty: float
+    outf: Path
+    # Only set if the output was parsed in this run.
+    solution: Optional[Solution] = None
+    # Whether the penalty was computed rather than recorded.
+    verified: bool = False
+
+
+def pick_best(candidates: List[Candidate], instance: Instance,
+              verify: str) -> Optional[Candidate]:
+    """Returns the candidate with the lowest penalty, the first of any ties.
+    Unless verify is "none", a winner whose penalty was only recorded is
+    parsed and rescored first, and dropped for the next best if it is not
+    valid."""
+    while candidates:
+        best = min(candidates, key=lambda candidate: candidate.penalty)
+        if best.verified or verify == "none":
+            return best
+        sol = load_solution(best.outf, instance)
+        if sol is None:
+            print(f"{str(best.outf)}: not a valid solution, trying the next "
+                  "best output")
+            candidates.remove(best)
+            continue
+        best.penalty, best.solution, best.verified = sol.penalty(), sol, True
+    return None
+
+
+def write_best(outf: Path, best: Candidate) -> None:
+    """Writes the best output with its penalty in the header. Outputs that
+    were not parsed are copied as they are."""
+    if best.solution is not None:
+        with outf.open('w') as f:
+            print(parse.PENALTY_HEADER, best.penalty, file=f)
+            best.solution.serialize(f)
+        return
+    text = best.outf.read_text()
+    if parse.penalty_header(text.splitlines()) is None:
+        text = f"{parse.PENALTY_HEADER} {best.penalty}\n{text}"
+    outf.write_text(text)
+
+
+def source_key(outf: Path) -> str:
+    """Returns the merge manifest key of an output file."""
+    return str(outf.resolve())
+
+
+def stored_candidate(outf: Path, entry: Optional[Dict[str, Any]],
+                     input_stamp: List[int], verify: str
+                     ) -> Optional[Candidate]:
+    """Returns the candidate that the merge manifest entry of an output
+    records, or None if the output or its input changed since. Unverified
+    penalties are not reused with --verify=all. Entries that are malformed,
+    e.g. written by an older version, count as missing."""
+    try:
+        if entry["input"] != input_stamp:
+            return None
+        verified = bool(entry["verified"])
+        penalty = float(entry["penalty"])
+        stamp = entry["stamp"]
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not verified and verify == "all":
+        return None
+    try:
+        if stamp != file_stamp(outf):
+            return None
+    except OSError:
+        return None
+    return Candidate(penalty, outf, verified=verified)
+
+
+def live_sources(sources: Dict[str, Any], outfs: Iterable[Path]
+                 ) -> Dict[str, Any]:
+    """Returns the merge manifest entries of those outputs that still
+    exist, so that entries of deleted outputs are dropped."""
+    live = {source_key(outf) for outf in outfs if outf.exists()}
+    return {key: entry for key, entry in sources.items() if key in live}
+
+
 def process_one(args):
-    _, inf, outfs, flags = args
+    """Merges the outputs for one input and returns the seconds it took, a
+    RunRecord for every output whose penalty it computed and the merge
+    manifest entries of the outputs that were read or written.
+
+    With --verify=all every output is parsed, validated and scored. With
+    winner or none, outputs are ranked by their recorded penalty and only
+    outputs without one are scored, skipping invalid ones. Then winner
+    verifies the best output before writing it, while none copies it as it
+    is.
+
+    Outputs whose stored merge manifest entry is still current are ranked by
+    it without being read. If that leaves nothing to read and the merged
+    output is already the best, the input is not parsed either.
+    """
+    size, inf, outfs, indexed, stored, flags = args
+    start = time.perf_counter()
+    records = []
+    seen = {}
     try:
-        with inf.open('r') as f:
-            instance = Instance.parse(f.readlines())
+        input_stamp = file_stamp(inf)
+        # The merged output comes first, so that it wins ties and is not
+        # rewritten with a copy of itself.
+        order = [len(outfs) - 1] + list(range(len(outfs) - 1))
+        existing = [i for i in order if outfs[i].exists()]
+        known = {}
+        for i in existing:
+            candidate = stored_candidate(outfs[i], stored[i], input_stamp,
+                                         flags.verify)
+            if candidate is not None:
+                known[i] = candidate
+        if existing and len(known) == len(existing):
+            best = min(known.values(), key=lambda candidate: candidate.penalty)
+            if best.outf == outfs[-1] and (best.verified or
+                                           flags.verify == "none"):
+                if flags.verbose:
+                    print(f"{str(inf)}: no outputs changed (penalty "
+                          f"{best.penalty})", flush=True)
+                return time.perf_counter() - start, records, seen
+
+        instance = Instance.parse_bytes(inf.read_bytes())
 
-        solutions = []
-        for outf in outfs:
-            if not outf.exists():
+        candidates = []
+        stamps = {}
+        # Outputs whose penalty was computed in this run.
+        scored = set()
+        for i in existing:
+            outf = outfs[i]
+            if i in known:
+                candidates.append(known[i])
+                stamps[outf] = stored[i]["stamp"]
                 continue
-            with outf.open('r') as f:
-                sol = Solution.parse(f.readlines(), instance)
-                assert sol.valid()
-                solutions.append(sol)
+            # Taken before reading, so that a concurrent rewrite is seen as
+            # a change next time.
+            stamps[outf] = file_stamp(outf)
+            penalty = indexed[i]
+            if flags.verify == "all":
+                sol = score(outf, instance)
+            else:
+                penalty = recorded_penalty(outf, penalty)
+                if penalty is not None:
+                    candidates.append(Candidate(penalty, outf))
+                    continue
+                # Like pick_best(), skip invalid outputs rather than fail.
+                sol = load_solution(outf, instance)
+                if sol is None:
+                    print(f"{str(outf)}: not a valid solution, skipping it")
+                    continue
+            candidates.append(Candidate(sol.penalty(), outf, sol, True))
+            scored.add(outf)
 
-        if not solutions:
+        if not candidates:
             print(f"{str(inf)}: no solutions found")
-            return
+            return time.perf_counter() - start, records, seen
+
+        unverified = {candidate.outf for candidate in candidates
+                      if not candidate.verified}
+        best = pick_best(candidates, instance, flags.verify)
+        # pick_best() rescores the candidates it tries and drops invalid ones.
+        scored.update(candidate.outf for candidate in candidates
+                      if candidate.verified and candidate.outf in unverified)
 
-        best_idx = min(range(len(solutions)),
-                       key=lambda s: solutions[s].penalty(), default=None)
-        best = solutions[best_idx]
-        best_penalty = best.penalty()
+        if flags.history is not None:
+            # Only penalties computed here are recorded, as recorded ones may
+            # be wrong. The merged folder only holds copies of the others.
+            records = output_records(
+                inf, instance, [(candidate.outf, candidate.penalty)
+                                for candidate in candidates
+                                if candidate.outf in scored and
+                                candidate.outf != outfs[-1]])
+        # Outputs that pick_best() found invalid are left out, so that they
+        # are read again next time.
+        for candidate in candidates:
+            seen[source_key(candidate.outf)] = {
+                "stamp": stamps[candidate.outf], "input": input_stamp,
+                "penalty": candidate.penalty,
+                "verified": candidate.verified}
+        if best is None:
+            print(f"{str(inf)}: no valid solutions found")
+            return time.perf_counter() - start, records, seen
+        # The lower bound costs more than ranking by recorded penalties.
+        gap = ""
+        if flags.verify == "all":
+            gap = f", gap {max(best.penalty - lower_bound(instance), 0.0):.3f}"
 
-        with outfs[-1].open('w') as f:
-            print("# Penalty:", best_penalty, file=f)
-            best.serialize(f)
+        if best.outf != outfs[-1]:
+            write_best(outfs[-1], best)
+            seen[source_key(outfs[-1])] = {
+                "stamp": file_stamp(outfs[-1]), "input": input_stamp,
+                "penalty": best.penalty, "verified": best.verified}
 
     except Exception as e:
-        print(f"{size} job failed ({inf}):", error)
+        print(f"{size} job failed ({inf}):", e)
     else:
         if flags.verbose:
             print(
-                f"{str(inf)}: best {str(outfs[best_idx])} (penalty {best_penalty})")
+                f"{str(inf)}: best {str(best.outf)} (penalty {best.penalty}"
+                f"{gap})", flush=True)
+    return time.perf_counter() - start, records, seen
 
 def main(args):
     outroot = Path(args.outputs[-1])
@@ -91,8 +300,48 @@ def main(args):
         print("No input files found.")
         print("Are you sure you passed the input folder correctly?")
 
-    with multiprocessing.Pool(args.parallelism) as pool:
-        pool.map(process_one, ((*tup, args) for tup in traverse_files(args.inputs, args.outputs)))
+    # The penalties that solve_all.py recorded in each output folder stand
+    # in for headers of outputs that have none.
+    manifests = [load_manifest(Path(outroot)) if args.verify != "all" else {}
+                 for outroot in args.outputs]
+    # What earlier --incremental merges into this folder read.
+    sources = live_sources(
+        load_manifest(outroot, MERGE_MANIFEST_NAME),
+        (outf for _, _, outfs in files for outf in outfs)) \
+        if args.incremental else {}
+    costs = estimate_costs([(size, inf, None) for size, inf, _ in files])
+    jobs = [(size, inf, outfs,
+             [manifest.get(f"{size}/{inf.stem}", {}).get("penalty")
+              for manifest in manifests],
+             [sources.get(source_key(outf)) for outf in outfs], args)
+            for size, inf, outfs in largest_first(files, costs)]
+    start = time.perf_counter()
+    job_seconds = []
+    runs = []
+
+    def _flush():
+        # Runs and manifest entries are stored in batches, as every
+        # transaction syncs the database and the manifest is rewritten whole.
+        if args.history is not None and runs:
+            with History(args.history) as history:
+                history.record(runs)
+            runs.clear()
+        if args.incremental:
+            save_manifest(outroot, sources, MERGE_MANIFEST_NAME)
+
+    try:
+        with multiprocessing.Pool(args.parallelism) as pool:
+            for seconds, records, seen in pool.imap_unordered(
+                    process_one, jobs, chunksize=1):
+                job_seconds.append(seconds)
+                runs.extend(records)
+                sources.update(seen)
+                if len(job_seconds) % BATCH_SIZE == 0:
+                    _flush()
+    finally:
+        _flush()
+    print(makespan_report(time.perf_counter() - start, job_seconds,
+                          args.parallelism))
 
 
 if __name__ == "__main__":
@@ -107,6 +356,20 @@ if __name__ == "__main__":
                         help="Whether to verbosely log the best solution.")
     parser.add_argument("--parallelism", type=int,
                         help="Number of processes to spawn. Default: number of CPU cores.", default=None)
+    parser.add_argument("--history", type=str, default=None,
+                        help="Path to an SQLite database to record the "
+                        "penalty of every output in. See history.py.")
+    parser.add_argument("--verify", choices=("all", "winner", "none"),
+                        default="all",
+                        help="all: parse and score every output. winner: "
+                        "rank outputs by the penalty recorded in their "
+                        "header or folder manifest, and only verify the best "
+                        "one, falling back to the next best if it is "
+                        "invalid. none: trust the recorded penalties.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only read outputs that are new or changed "
+                        "since the last --incremental merge into the same "
+                        "folder, going by their modification time and size.")
     args = parser.parse_args()
 
     if args.parallelism is None:
@@ -0,0 +1,144 @@
+import argparse
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from instance import Instance
+from manifest import file_stamp
+from merge import live_sources, process_one, source_key, stored_candidate
+from point import Point
+from solution import Solution
+
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1)],
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.inf = self.root / "inputs" / "small" / "001.in"
+        self.inf.parent.mkdir(parents=True)
+        self.inf.write_text(self.instance.serialize_to_string())
+        # One tower covering both cities, and two towers.
+        self.one = Solution(towers=[Point(x=2, y=1)], instance=self.instance)
+        self.two = Solution(towers=[Point(x=1, y=1), Point(x=3, y=1)],
+                            instance=self.instance)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _output(self, root, text):
+        outf = self.root / root / "small" / "001.out"
+        outf.parent.mkdir(parents=True, exist_ok=True)
+        if text is not None:
+            outf.write_text(text)
+        return outf
+
+    def _merge(self, outfs, verify, indexed=None, stored=None):
+        flags = argparse.Namespace(verify=verify, history="history.db",
+                                   verbose=False)
+        job = ("small", self.inf, outfs, indexed or [None] * len(outfs),
+               stored or [None] * len(outfs), flags)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, records, seen = process_one(job)
+        self.records = records
+        self.seen = seen
+        return outfs[-1].read_text()
+
+    def test_verify_all_scores_every_output(self):
+        # The misleading header is ignored.
+        outfs = [self._output("a", "# Penalty: 1\n"
+                              + self.two.serialize_to_string()),
+                 self._output("b", self.one.serialize_to_string()),
+                 self._output("best", None)]
+        merged = self._merge(outfs, "all")
+        self.assertEqual(self.one.towers,
+                         Solution.parse(merged.splitlines(),
+                                        self.instance).towers)
+
+    def test_verify_winner_falls_back(self):
+        # The best recorded penalty is wrong, so the output is rescored and
+        # loses. The output claiming an impossible penalty is invalid.
+        outfs = [self._output("a", "# Penalty: 1\n"
+                              + self.two.serialize_to_string()),
+                 self._output("b", "# Penalty: 0\n1\n9 9"),
+                 self._output("c", self.one.serialize_to_string()),
+                 self._output("best", None)]
+        merged = self._merge(outfs, "winner", indexed=[None, None, 170.0, None])
+        self.assertTrue(merged.startswith(f"# Penalty: {self.one.penalty()}"))
+        self.assertEqual(self.one.towers,
+                         Solution.parse(merged.splitlines(),
+                                        self.instance).towers)
+        # Only the rescored penalties are recorded.
+        self.assertEqual({("a", self.two.penalty()), ("c", self.one.penalty())},
+                         {(record.solver, record.penalty)
+                          for record in self.records})
+
+    def test_verify_winner_skips_invalid_unranked_outputs(self):
+        outfs = [self._output("a", "1\n9 9"),
+                 self._output("b", self.one.serialize_to_string()),
+                 self._output("best", None)]
+        merged = self._merge(outfs, "winner")
+        self.assertEqual(self.one.towers,
+                         Solution.parse(merged.splitlines(),
+                                        self.instance).towers)
+        self.assertEqual(["b"], [record.solver for record in self.records])
+
+    def test_verify_none_copies_the_recorded_best(self):
+        outfs = [self._output("a", self.two.serialize_to_string()),
+                 self._output("b", self.one.serialize_to_string()),
+                 self._output("best", None)]
+        merged = self._merge(outfs, "none", indexed=[300.0, 200.0, None])
+        self.assertEqual("# Penalty: 200.0\n"
+                         + self.one.serialize_to_string(), merged)
+
+    def test_incremental_reads_only_changed_outputs(self):
+        outfs = [self._output("a", self.two.serialize_to_string()),
+                 self._output("b", None),
+                 self._output("best", None)]
+        self._merge(outfs, "all")
+        stored = [self.seen.get(source_key(outf)) for outf in outfs]
+        self.assertEqual([self.two.penalty(), None, self.two.penalty()],
+                         [entry and entry["penalty"] for entry in stored])
+
+        # Nothing changed, so nothing is read or written.
+        self._merge(outfs, "all", stored=stored)
+        self.assertEqual({}, self.seen)
+
+        outfs[1].write_text(self.one.serialize_to_string())
+        merged = self._merge(outfs, "all", stored=stored)
+        self.assertEqual(self.one.towers,
+                         Solution.parse(merged.splitlines(),
+                                        self.instance).towers)
+        self.assertEqual(self.one.penalty(),
+                         self.seen[source_key(outfs[2])]["penalty"])
+
+
+    def test_malformed_entries_are_missing(self):
+        outf = self._output("a", self.one.serialize_to_string())
+        stamp = file_stamp(self.inf)
+        entry = {"input": stamp, "stamp": file_stamp(outf), "penalty": 170.0,
+                 "verified": True}
+        self.assertEqual(170.0,
+                         stored_candidate(outf, entry, stamp, "all").penalty)
+        for malformed in (None, [], {}, {**entry, "penalty": None},
+                          {key: entry[key] for key in entry
+                           if key != "verified"}):
+            self.assertIsNone(stored_candidate(outf, malformed, stamp, "all"))
+
+    def test_entries_of_deleted_outputs_are_dropped(self):
+        outfs = [self._output("a", self.one.serialize_to_string()),
+                 self._output("b", self.two.serialize_to_string())]
+        sources = {source_key(outf): {} for outf in outfs}
+        outfs[1].unlink()
+        self.assertEqual([source_key(outfs[0])],
+                         list(live_sources(sources, outfs)))
+
+if __name__ == "__main__":
+    unittest.main()
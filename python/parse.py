@@ -1,5 +1,9 @@
 import io
-from typing import Callable, Iterable, Iterator, TextIO, TypeVar
+from array import array
+from typing import Callable, Iterable, Iterator, Optional, TextIO, TypeVar
+
+# Comment that outputs start with to record their penalty.
+PENALTY_HEADER = "# Penalty:"
 
 
 def serialize_to_string_impl(serialize: Callable[[TextIO], None], t: any) -> str:
@@ -14,3 +18,40 @@ def remove_comments(lines: Iterable[str]) -> Iterator[str]:
         if line.startswith("#"):
             continue
         yield line
+
+
+def read_ints(data: bytes) -> array:
+    """Returns all the integers in the contents of a file, skipping comment
+    lines, in one pass and without checking how they are split into lines.
+
+    >>> read_ints(b"# Penalty: 170.0\\n2\\n0 1\\n3 4\\n").tolist()
+    [2, 0, 1, 3, 4]
+    """
+    if b"#" in data:
+        data = b"\n".join(line for line in data.split(b"\n")
+                          if not line.startswith(b"#"))
+    try:
+        return array("i", map(int, data.split()))
+    except OverflowError as e:
+        raise ValueError(e) from e
+
+
+def penalty_header(lines: Iterable[str]) -> Optional[float]:
+    """Returns the penalty recorded in the leading comments of an output, or
+    None if there is none. Stops reading at the first line that is not a
+    comment.
+
+    >>> penalty_header(["# Penalty: 170.0", "1", "0 0"])
+    170.0
+    >>> penalty_header(["1", "# Penalty: 170.0"]) is None
+    True
+    """
+    for line in lines:
+        if not line.startswith("#"):
+            return None
+        if line.startswith(PENALTY_HEADER):
+            try:
+                return float(line[len(PENALTY_HEADER):])
+            except ValueError:
+                return None
+    return None
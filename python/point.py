@@ -18,9 +18,16 @@ def _coalesce(*args: Optional[T], default: T) -> T:
 
 @dataclasses.dataclass(frozen=True, eq=True)
 class Point:
+    __slots__ = ("x", "y")
+
     x: int
     y: int
 
+    def __reduce__(self):
+        # Frozen dataclasses with __slots__ cannot be unpickled through
+        # setattr, so rebuild the point through its constructor instead.
+        return (Point, (self.x, self.y))
+
     def distance_sq(self: Point, second: Point):
         """Returns the squared distance between two points.
 
@@ -59,6 +66,22 @@ class Point:
         """
         return Distance((self.x - second.x) ** 2 + (self.y - second.y) ** 2)
 
+    def within(self: Point, second: Point, radius_sq: int) -> bool:
+        """Returns whether the two points are at most sqrt(radius_sq) apart.
+
+        This is the allocation-free counterpart of comparing distance_obj
+        against a radius: square the radius once, outside of any loop, and
+        compare plain integers.
+
+        >>> Point.within(Point(0, 0), Point(3, 4), 5 ** 2)
+        True
+        >>> Point.within(Point(0, 0), Point(3, 4), 4 ** 2)
+        False
+        """
+        dx = self.x - second.x
+        dy = self.y - second.y
+        return dx * dx + dy * dy <= radius_sq
+
     def replace(self, *, x: Optional[int] = None, y: Optional[int] = None) -> Point:
         """Constructs a new Point with the parameters passed replaced.
 
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from array import array
+from typing import (Iterable, Iterator, MutableSequence, Sequence, Tuple,
+                    Union, overload)
+
+from point import Point
+
+
+class PointArray(MutableSequence[Point]):
+    """A list of points stored as two int arrays of coordinates.
+
+    Each point costs 8 bytes instead of a full Point object. Indexing and
+    iteration produce Point views, so a PointArray can be used wherever a
+    list of points is expected, and it compares equal to any sequence of the
+    same points.
+
+    >>> points = PointArray([Point(1, 2), Point(3, 4)])
+    >>> points[1]
+    Point(x=3, y=4)
+    >>> points == [Point(1, 2), Point(3, 4)]
+    True
+    >>> list(points.keys(10))
+    [21, 43]
+    """
+
+    __slots__ = ("xs", "ys")
+
+    def __init__(self, points: Iterable[Point] = ()):
+        self.xs = array("i")
+        self.ys = array("i")
+        for point in points:
+            self.xs.append(point.x)
+            self.ys.append(point.y)
+
+    @staticmethod
+    def from_coords(xs: Iterable[int], ys: Iterable[int]) -> PointArray:
+        """Builds a PointArray from separate x and y coordinates."""
+        points = PointArray()
+        points.xs = array("i", xs)
+        points.ys = array("i", ys)
+        assert len(points.xs) == len(points.ys)
+        return points
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    @overload
+    def __getitem__(self, idx: int) -> Point: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> PointArray: ...
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Point, PointArray]:
+        if isinstance(idx, slice):
+            return PointArray.from_coords(self.xs[idx], self.ys[idx])
+        return Point(self.xs[idx], self.ys[idx])
+
+    def __setitem__(self, idx, value) -> None:
+        if isinstance(idx, slice):
+            value = PointArray(value)
+            self.xs[idx] = value.xs
+            self.ys[idx] = value.ys
+            return
+        self.xs[idx] = value.x
+        self.ys[idx] = value.y
+
+    def __delitem__(self, idx) -> None:
+        del self.xs[idx]
+        del self.ys[idx]
+
+    def insert(self, idx: int, value: Point) -> None:
+        self.xs.insert(idx, value.x)
+        self.ys.insert(idx, value.y)
+
+    def append(self, value: Point) -> None:
+        self.xs.append(value.x)
+        self.ys.append(value.y)
+
+    def __iter__(self) -> Iterator[Point]:
+        return map(Point, self.xs, self.ys)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PointArray):
+            return self.xs == other.xs and self.ys == other.ys
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PointArray({list(self)!r})"
+
+    def __reduce__(self):
+        return (PointArray.from_coords, (self.xs, self.ys))
+
+    def keys(self, grid_side_length: int) -> array:
+        """Returns the packed key y * D + x of every point.
+
+        Keys are unique among points inside a grid of side length D, which
+        makes them cheap to hash, sort and deduplicate.
+        """
+        D = grid_side_length
+        return array("q", [y * D + x for x, y in zip(self.xs, self.ys)])
+
+
+def coords(points: Sequence[Point]) -> Tuple[Sequence[int], Sequence[int]]:
+    """Returns the x and y coordinates of points. Those of a PointArray are
+    its own arrays, so no Point is created.
+
+    >>> coords([Point(1, 2), Point(3, 4)])
+    ([1, 3], [2, 4])
+    """
+    if isinstance(points, PointArray):
+        return points.xs, points.ys
+    return [point.x for point in points], [point.y for point in points]
@@ -0,0 +1,56 @@
+import pickle
+import unittest
+
+from point import Point
+from point_array import PointArray
+
+
+class TestPointArray(unittest.TestCase):
+    def test_sequence(self):
+        points = PointArray([Point(1, 2), Point(3, 4), Point(5, 6)])
+        self.assertEqual(3, len(points))
+        self.assertEqual(Point(5, 6), points[-1])
+        self.assertEqual([Point(1, 2), Point(3, 4), Point(5, 6)], list(points))
+        self.assertEqual(PointArray([Point(3, 4)]), points[1:2])
+        self.assertIn(Point(3, 4), points)
+        self.assertEqual(1, points.index(Point(3, 4)))
+
+    def test_mutation(self):
+        points = PointArray()
+        points.append(Point(1, 2))
+        points.extend([Point(3, 4), Point(5, 6)])
+        points[0] = Point(7, 8)
+        del points[1]
+        points.insert(0, Point(0, 0))
+        self.assertEqual([Point(0, 0), Point(7, 8), Point(5, 6)], points)
+        points.remove(Point(7, 8))
+        self.assertEqual(Point(5, 6), points.pop())
+        self.assertEqual([Point(0, 0)], points)
+
+    def test_equality(self):
+        points = PointArray([Point(1, 2)])
+        self.assertEqual(points, [Point(1, 2)])
+        self.assertEqual([Point(1, 2)], points)
+        self.assertEqual(points, (Point(1, 2),))
+        self.assertNotEqual(points, [Point(2, 1)])
+        self.assertNotEqual(points, [Point(1, 2), Point(1, 2)])
+        self.assertNotEqual(points, "12")
+
+    def test_keys(self):
+        points = PointArray([Point(1, 2), Point(9, 9), Point(0, 0)])
+        self.assertEqual([21, 99, 0], list(points.keys(10)))
+
+    def test_pickle(self):
+        points = PointArray([Point(1, 2), Point(3, 4)])
+        self.assertEqual(points, pickle.loads(pickle.dumps(points)))
+        self.assertEqual(Point(1, 2), pickle.loads(pickle.dumps(Point(1, 2))))
+
+    def test_from_coords(self):
+        points = PointArray.from_coords([1, 3], [2, 4])
+        self.assertEqual([Point(1, 2), Point(3, 4)], points)
+        with self.assertRaises(AssertionError):
+            PointArray.from_coords([1], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,6 +38,15 @@ class TestParsePoint(unittest.TestCase):
         want = Distance(5)
         self.assertEqual(want, Point.distance_obj(first, second))
 
+    def test_within_matches_distance_obj(self):
+        first = Point(1, 2)
+        for second in (Point(1, 2), Point(4, 6), Point(4, 7), Point(-2, 2)):
+            for radius in range(0, 7):
+                self.assertEqual(
+                    Point.distance_obj(first, second) <= radius,
+                    Point.within(first, second, radius * radius),
+                )
+
     def test_serialize(self):
         point = Point(1, 2)
         sio = io.StringIO()
@@ -0,0 +1,153 @@
+"""Races several solver runs on one instance across worker processes."""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from anneal import anneal
+from greedy import solve_greedy
+from instance import Instance
+from lns import lns
+from point import Point
+from solution import Solution
+from watchdog import checkpoint
+
+# A strategy improves on an optional initial solution within a time limit.
+Strategy = Callable[[Instance, float, int, Optional[Solution]], Solution]
+
+STRATEGIES: Dict[str, Strategy] = {
+    "anneal": lambda instance, time_limit, seed, initial: anneal(
+        instance, time_limit=time_limit, seed=seed, initial=initial)[0],
+    "lns": lambda instance, time_limit, seed, initial: lns(
+        instance, time_limit=time_limit, seed=seed, initial=initial)[0],
+}
+
+# Strategies assigned to workers in turn.
+DEFAULT_STRATEGIES = ("anneal", "lns")
+
+# Workers report to the shared best this many times over the time limit.
+_ROUNDS = 4
+
+# Seconds to wait past the time limit for a worker to report.
+_GRACE = 60.0
+
+# A worker restarts from scratch with a new seed when its best is this much
+# worse, relatively, than the best of all workers.
+_RESTART_SLACK = 0.02
+
+
+def _pack(solution: Optional[Solution]) -> Optional[List[Tuple[int, int]]]:
+    return None if solution is None else [(t.x, t.y) for t in solution.towers]
+
+
+def _worker(instance: Instance, strategy: str, seed: int, stride: int,
+            deadline: float, round_time: float, initial: Optional[Solution],
+            best, results) -> None:
+    run = STRATEGIES[strategy]
+    own = initial
+    own_penalty = float("inf") if initial is None else initial.penalty()
+    restarts = 0
+    try:
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            solution = run(instance, min(round_time, remaining), seed, own)
+            penalty = solution.penalty()
+            if penalty < own_penalty:
+                own, own_penalty = solution, penalty
+            with best.get_lock():
+                leading = own_penalty < best.value
+                if leading:
+                    best.value = own_penalty
+                shared = best.value
+            if leading:
+                # The parent keeps it in case it is interrupted early.
+                results.put(("checkpoint", own_penalty, _pack(own)))
+            if own_penalty > shared * (1 + _RESTART_SLACK):
+                # Another worker is well ahead; search somewhere else.
+                seed += stride
+                restarts += 1
+                own = None
+                own_penalty = float("inf")
+    finally:
+        results.put(("done", strategy, seed, restarts, own_penalty,
+                     _pack(own)))
+
+
+def solve_portfolio(instance: Instance, time_limit: float = 10.0,
+                    seed: int = 0, processes: Optional[int] = None,
+                    strategies: Sequence[str] = DEFAULT_STRATEGIES,
+                    initial: Optional[Solution] = None,
+                    verbose: bool = False) -> Solution:
+    """Runs the strategies in processes worker processes for time_limit
+    seconds and returns the best solution any of them found.
+
+    Worker i runs strategies[i % len(strategies)] with seed + i, in rounds.
+    After every round a worker publishes its best penalty to a shared value,
+    and a worker that has fallen well behind the best restarts with a fresh
+    seed instead of polishing a poor solution. Workers start from initial
+    if it is given. The greedy solution, or initial if it is better, is
+    returned if no worker finishes a round.
+
+    A new best of any worker is recorded with watchdog.checkpoint() in this
+    process, so that a caller interrupted by watchdog.time_limit() can
+    still use it.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    assert processes > 0 and strategies
+
+    best = multiprocessing.Value("d", float("inf"))
+    results = multiprocessing.Queue()
+    deadline = time.time() + time_limit
+    round_time = time_limit / _ROUNDS
+    workers = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(instance, strategies[i % len(strategies)], seed + i,
+                  processes, deadline, round_time, initial, best, results))
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    # Drain the queue before joining so that no worker blocks on a full pipe.
+    reports: List[Tuple[str, int, int, float, Optional[List[Tuple[int, int]]]]] = []
+    checkpointed = float("inf")
+    try:
+        while len(reports) < len(workers):
+            try:
+                kind, *message = results.get(
+                    timeout=max(deadline - time.time(), 0) + _GRACE)
+            except queue.Empty:
+                break
+            if kind == "done":
+                reports.append(tuple(message))
+            elif message[0] < checkpointed:
+                checkpointed, towers = message
+                checkpoint(instance, [Point(x, y) for x, y in towers])
+        for worker in workers:
+            worker.join(timeout=_GRACE)
+    finally:
+        # Also reached when the caller is interrupted, e.g. by a timeout.
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    solution = solve_greedy(instance)
+    penalty = solution.penalty()
+    if initial is not None and initial.penalty() < penalty:
+        solution, penalty = initial, initial.penalty()
+    for strategy, final_seed, restarts, report_penalty, towers in reports:
+        if verbose:
+            print(f"portfolio: {strategy} (seed {final_seed}, {restarts} "
+                  f"restarts) {report_penalty:.3f}", file=sys.stderr)
+        if towers is not None and report_penalty < penalty:
+            solution = Solution(towers=[Point(x, y) for x, y in towers],
+                                instance=instance)
+            penalty = report_penalty
+    return solution
@@ -0,0 +1,61 @@
+import unittest
+from pathlib import Path
+
+from greedy import solve_greedy
+from instance import Instance
+from point import Point
+from portfolio import solve_portfolio
+from watchdog import JobTimeout, clear_checkpoint, last_checkpoint, time_limit
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+class TestPortfolio(unittest.TestCase):
+    def test_two_workers(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=8, y=8)],
+        )
+        solution = solve_portfolio(instance, time_limit=0.5, processes=2)
+        self.assertTrue(solution.valid())
+        self.assertEqual(340, solution.penalty())
+
+    def test_no_cities(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[],
+        )
+        solution = solve_portfolio(instance, time_limit=0.2, processes=1)
+        self.assertEqual([], solution.towers)
+
+    def test_interrupted_leaves_checkpoint(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=8, y=8)],
+        )
+        clear_checkpoint()
+        # The only worker reports after its first 0.5 second round.
+        with self.assertRaises(JobTimeout):
+            with time_limit(1.5):
+                solve_portfolio(instance, time_limit=2, processes=1)
+        self.assertTrue(last_checkpoint(instance).valid())
+
+    @unittest.skipUnless(INPUTS.exists(), "inputs are not available")
+    def test_not_worse_than_greedy(self):
+        with (INPUTS / "small" / "001.in").open() as f:
+            instance = Instance.parse(f.readlines())
+        solution = solve_portfolio(instance, time_limit=1, processes=2,
+                                   strategies=("anneal",))
+        self.assertTrue(solution.valid())
+        self.assertLessEqual(solution.penalty(),
+                             solve_greedy(instance).penalty())
+
+
+if __name__ == "__main__":
+    unittest.main()
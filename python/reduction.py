@@ -0,0 +1,144 @@
+"""Shrinks the set of tower cells a solver has to consider."""
+
+from __future__ import annotations
+
+import dataclasses
+import heapq
+from typing import Dict, List, Set, Tuple, TYPE_CHECKING
+
+from point import Point
+from stencil import crescent_offsets
+
+if TYPE_CHECKING:
+    from instance import Instance
+
+
+@dataclasses.dataclass
+class Reduction:
+    # Coverage index rows of the cells that may still hold a tower, sorted.
+    candidates: List[int]
+    # Towers that some optimal solution contains, given the candidates.
+    forced: List[Point]
+
+
+def reduce_instance(instance: Instance) -> Reduction:
+    """Removes dominated candidate cells and finds forced towers.
+
+    A cell a is dominated by a cell b if b covers every uncovered city that
+    a covers, and every other candidate within the penalty radius of b is
+    also within the penalty radius of a. Moving a tower from a to b then
+    never uncovers a city or increases any tower's overlap count, so a can
+    be dropped. A city that only one remaining cell covers forces a tower
+    there, after which cells that cover no uncovered city are dropped too.
+    Both rules are applied until neither changes anything, and some optimal
+    solution always survives.
+
+    >>> from instance import Instance
+    >>> instance = Instance(grid_side_length=10, coverage_radius=1,
+    ...                     penalty_radius=1, cities=[Point(0, 0), Point(2, 0)])
+    >>> reduction = reduce_instance(instance)
+    >>> reduction.forced
+    [Point(x=1, y=0)]
+    >>> reduction.candidates
+    []
+    """
+    index = instance.coverage_index()
+    D = instance.grid_side_length
+    R = instance.penalty_radius
+    candidates: Set[int] = set(range(len(index)))
+    # Marks the cells that may hold a tower, on the grid padded by the
+    # penalty radius so that scanning a crescent needs no bounds checks.
+    width = D + 2 * R
+    present = bytearray(width * width)
+    coords = [divmod(cell, D) for cell in index.cells]
+    slots = [(y + R) * width + x + R for y, x in coords]
+    for row in candidates:
+        present[slots[row]] = 1
+    # crescent_offsets() without the origin as steps between slots, keyed by
+    # the step from the center of the crescent to the cell it excludes.
+    crescents: Dict[int, Tuple[int, ...]] = {}
+    uncovered = [True] * len(instance.cities)
+    forced: List[Point] = []
+    covers = {row: frozenset(index.covered(row)) for row in candidates}
+    # Cells that witnessed a failed domination check. Cells are only ever
+    # removed, so a check can only succeed once its witness is gone or the
+    # dominated row covers fewer cities. Rows are rechecked only then.
+    witnesses: Dict[int, int] = {}
+    waiting: Dict[int, List[int]] = {}
+    # Rows to check, smallest cover first.
+    pending = [(len(cover), row) for row, cover in covers.items()]
+    heapq.heapify(pending)
+    queued = set(candidates)
+
+    def _queue(row: int) -> None:
+        if row not in queued:
+            queued.add(row)
+            heapq.heappush(pending, (len(covers[row]), row))
+
+    def _remove(row: int) -> None:
+        candidates.remove(row)
+        slot = slots[row]
+        present[slot] = 0
+        for waiter in waiting.pop(slot, ()):
+            if waiter in candidates:
+                _queue(waiter)
+
+    def _dominated(row: int) -> bool:
+        cover = covers[row]
+        key = row * len(index)
+        for other in index.covering(next(iter(cover))):
+            if other == row or other not in candidates \
+                    or not cover <= covers[other]:
+                continue
+            witness = witnesses.get(key + other, -1)
+            if witness >= 0 and present[witness]:
+                continue
+            # Looks for a possible tower near other but not near row.
+            slot = slots[other]
+            steps = crescents.get(slots[row] - slot)
+            if steps is None:
+                (ay, ax), (by, bx) = coords[row], coords[other]
+                steps = crescents[slots[row] - slot] = tuple(
+                    oy * width + ox
+                    for ox, oy in crescent_offsets(R, ax - bx, ay - by)
+                    if ox or oy)
+            for step in steps:
+                if present[slot + step]:
+                    witness = slot + step
+                    break
+            else:
+                return True
+            witnesses[key + other] = witness
+            waiting.setdefault(witness, []).append(row)
+        return False
+
+    while pending:
+        while pending:
+            _, row = heapq.heappop(pending)
+            queued.discard(row)
+            if row in candidates and (not covers[row] or _dominated(row)):
+                _remove(row)
+
+        for city in range(len(instance.cities)):
+            if not uncovered[city]:
+                continue
+            rows = [row for row in index.covering(city) if row in candidates]
+            if len(rows) == 1:
+                row = rows[0]
+                # The cell stays present: it holds a tower for good.
+                candidates.remove(row)
+                forced.append(index.cell_point(row))
+                newly = [covered for covered in index.covered(row)
+                         if uncovered[covered]]
+                for covered in newly:
+                    uncovered[covered] = False
+                # Only the rows that lost cities can become dominated.
+                shrunk = {other for covered in newly
+                          for other in index.covering(covered)
+                          if other in candidates}
+                for other in shrunk:
+                    covers[other] = frozenset(
+                        city for city in covers[other] if uncovered[city])
+                    _queue(other)
+
+    return Reduction(candidates=sorted(candidates), forced=forced)
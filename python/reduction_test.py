@@ -0,0 +1,76 @@
+import itertools
+import unittest
+from pathlib import Path
+
+from exact import branch_and_bound
+from instance import Instance
+from point import Point
+from reduction import reduce_instance
+from solution import Solution
+
+INPUTS = Path(__file__).resolve().parent.parent / "inputs"
+
+
+def _optimum(instance, rows, fixed=()):
+    """Brute-forces the best solution using the fixed towers and any subset
+    of the given coverage index rows."""
+    index = instance.coverage_index()
+    best = float("inf")
+    for k in range(len(instance.cities) + 1):
+        for chosen in itertools.combinations(rows, k):
+            towers = list(fixed) + [index.cell_point(row) for row in chosen]
+            solution = Solution(towers=towers, instance=instance)
+            if solution.valid():
+                best = min(best, solution.penalty())
+    return best
+
+
+class TestReduction(unittest.TestCase):
+    def setUp(self):
+        self.instance = Instance(
+            grid_side_length=8,
+            coverage_radius=1,
+            penalty_radius=3,
+            cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=6, y=2),
+                    Point(x=2, y=5), Point(x=0, y=7)],
+        )
+
+    def test_keeps_optimum(self):
+        instance = self.instance
+        reduction = reduce_instance(instance)
+        self.assertLess(len(reduction.candidates) + len(reduction.forced),
+                        len(instance.coverage_index()))
+        self.assertAlmostEqual(
+            _optimum(instance, range(len(instance.coverage_index()))),
+            _optimum(instance, reduction.candidates, reduction.forced))
+
+    def test_forced_corner(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=0, y=0), Point(x=9, y=9)],
+        )
+        reduction = reduce_instance(instance)
+        self.assertEqual(2, len(reduction.forced))
+        self.assertEqual([], reduction.candidates)
+        self.assertTrue(Solution(towers=reduction.forced,
+                                 instance=instance).valid())
+
+    def test_cached(self):
+        self.assertIs(self.instance.reduction(), self.instance.reduction())
+
+    @unittest.skipUnless(INPUTS.exists(), "inputs are not available")
+    def test_small_inputs(self):
+        with (INPUTS / "small" / "005.in").open() as f:
+            instance = Instance.parse(f.readlines())
+        reduction = instance.reduction()
+        self.assertLess(len(reduction.candidates),
+                        len(instance.coverage_index()))
+        result = branch_and_bound(instance, time_limit=30)
+        self.assertTrue(result.optimal)
+        self.assertAlmostEqual(1870, result.penalty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Orders batch jobs so that pools finish them sooner."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import parse
+
+T = TypeVar("T")
+
+# Rough cost of a city in each size class relative to a small one. Larger
+# grids have more candidate cells per city and larger penalty discs.
+SIZE_WEIGHTS = {"small": 1.0, "medium": 3.0, "large": 10.0}
+
+
+def num_cities(inf: Path) -> int:
+    """Reads the number of cities from the header of an input file, or
+    returns 0 if it is malformed."""
+    try:
+        with Path(inf).open() as f:
+            return int(next(parse.remove_comments(f)))
+    except (OSError, ValueError, StopIteration):
+        return 0
+
+
+def estimate_costs(
+        jobs: Sequence[Tuple[str, Path, Optional[float]]]) -> List[float]:
+    """Estimates the cost of each (size, input file, earlier runtime) job.
+
+    A job that ran before costs its earlier runtime. Any other job costs its
+    number of cities weighted by size class, converted to seconds with the
+    median runtime per weighted city of the jobs that did run before.
+    """
+    units = [SIZE_WEIGHTS.get(size, 1.0) * num_cities(inf)
+             for size, inf, _ in jobs]
+    ratios = sorted(seconds / unit
+                    for (_, _, seconds), unit in zip(jobs, units)
+                    if seconds is not None and unit > 0)
+    scale = ratios[len(ratios) // 2] if ratios else 1.0
+    return [seconds if seconds is not None else unit * scale
+            for (_, _, seconds), unit in zip(jobs, units)]
+
+
+def largest_first(jobs: Sequence[T], costs: Sequence[float]) -> List[T]:
+    """Returns the jobs ordered by decreasing cost, ties in their original
+    order, so that no expensive job starts last and leaves workers idle.
+
+    >>> largest_first(["a", "b", "c", "d"], [1.0, 3.0, 2.0, 2.0])
+    ['b', 'c', 'd', 'a']
+    """
+    order = sorted(range(len(jobs)), key=lambda i: -costs[i])
+    return [jobs[i] for i in order]
+
+
+def makespan_report(makespan: float, job_seconds: Iterable[float],
+                    processes: int) -> str:
+    """Summarizes how well a batch used its workers.
+
+    >>> makespan_report(10.0, [8.0, 8.0, 4.0], 2)
+    'makespan 10.0s, job time 20.0s over 3 jobs (2.00x on 2 workers, 100% busy)'
+    """
+    seconds = list(job_seconds)
+    total = sum(seconds)
+    speedup = total / makespan if makespan > 0 else 0.0
+    busy = speedup / processes if processes > 0 else 0.0
+    return (f"makespan {makespan:.1f}s, job time {total:.1f}s over "
+            f"{len(seconds)} jobs ({speedup:.2f}x on {processes} workers, "
+            f"{busy:.0%} busy)")
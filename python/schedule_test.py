@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from schedule import estimate_costs, largest_first, makespan_report, num_cities
+
+
+class TestSchedule(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _input(self, name, n):
+        inf = self.root / name
+        inf.write_text(f"# comment\n{n}\n30\n3\n8\n")
+        return inf
+
+    def test_num_cities(self):
+        self.assertEqual(20, num_cities(self._input("a.in", 20)))
+        self.assertEqual(0, num_cities(self.root / "missing.in"))
+
+    def test_estimate_costs(self):
+        small = self._input("small.in", 20)
+        large = self._input("large.in", 200)
+        self.assertEqual([20.0, 2000.0],
+                         estimate_costs([("small", small, None),
+                                         ("large", large, None)]))
+        # 0.5s for 20 weighted cities calibrates the unknown job.
+        self.assertEqual([0.5, 50.0],
+                         estimate_costs([("small", small, 0.5),
+                                         ("large", large, None)]))
+
+    def test_largest_first_stable(self):
+        self.assertEqual(["b", "a", "c"],
+                         largest_first(["a", "b", "c"], [1.0, 2.0, 1.0]))
+
+    def test_makespan_report(self):
+        self.assertIn("2.00x on 2 workers",
+                      makespan_report(5.0, [5.0, 5.0], 2))
+        self.assertIn("0 jobs", makespan_report(0.0, [], 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
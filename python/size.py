@@ -4,6 +4,7 @@ import dataclasses
 from typing import ClassVar
 
 from instance import Instance
+from stencil import Offsets, disc_offsets
 
 
 @dataclasses.dataclass
@@ -18,6 +19,16 @@ class Size:
     MEDIUM: ClassVar[Size]
     LARGE: ClassVar[Size]
 
+    @property
+    def coverage_offsets(self) -> Offsets:
+        """The (dx, dy) offsets of the grid cells a tower covers."""
+        return disc_offsets(self.coverage_radius)
+
+    @property
+    def penalty_offsets(self) -> Offsets:
+        """The (dx, dy) offsets of the grid cells a tower penalizes."""
+        return disc_offsets(self.penalty_radius)
+
     def instance_has_size(self, instance: Instance):
         return instance.grid_side_length == self.grid_side_length \
             and instance.coverage_radius == self.coverage_radius \
@@ -7,7 +7,10 @@ from typing import Iterable, List, TYPE_CHECKING
 import parse
 from instance import Instance
 from point import Point
+from point_array import PointArray, coords
+from spatial import SpatialHash
 from svg import SVGGraphic
+import vectorized
 
 if TYPE_CHECKING:
     from visualize import VisualizationConfig
@@ -25,36 +28,50 @@ class Solution:
         cities in the instance, all towers are in bounds, and there are no
         duplicate towers.
         """
-        for tower in self.towers:
-            if not 0 <= tower.x < self.instance.grid_side_length:
-                return False
-            if not 0 <= tower.y < self.instance.grid_side_length:
-                return False
-
-        for city in self.instance.cities:
-            for tower in self.towers:
-                if Point.distance_obj(city, tower) <= self.instance.coverage_radius:
-                    break
-            else:
-                return False
-
-        return len(set(self.towers)) == len(self.towers)
+        if vectorized.ENABLED:
+            return vectorized.valid(self.towers, self.instance)
+
+        D = self.instance.grid_side_length
+        xs, ys = coords(self.towers)
+        if xs and not (0 <= min(xs) and max(xs) < D and
+                       0 <= min(ys) and max(ys) < D):
+            return False
+
+        # All towers are in bounds, so packed keys identify them uniquely.
+        keys = [y * D + x for x, y in zip(xs, ys)]
+        if len(set(keys)) != len(keys):
+            return False
+
+        index = self.instance.coverage_index()
+        covered = [False] * len(self.instance.cities)
+        for key in keys:
+            row = index.cell_row(key)
+            if row >= 0:
+                for city_id in index.covered(row):
+                    covered[city_id] = True
+        return all(covered)
 
     def deduplicate(self):
         """Removes duplicate towers from the solution."""
+        D = self.instance.grid_side_length
+
+        def _key(tower):
+            if 0 <= tower.x < D and 0 <= tower.y < D:
+                return tower.y * D + tower.x
+            return (tower.x, tower.y)
+
         # Use dict to preserve tower order.
-        self.towers = list({tower: () for tower in self.towers}.keys())
+        self.towers = list({_key(tower): tower for tower in self.towers}.values())
 
     def penalty(self):
         """Computes the penalty for this solution."""
+        if vectorized.ENABLED:
+            return vectorized.penalty(self.towers, self.instance)
+
+        index = SpatialHash(self.towers, self.instance.penalty_radius)
         penalty = 0
-        for fidx, first in enumerate(self.towers):
-            num_overlaps = 0
-            for sidx, second in enumerate(self.towers):
-                if fidx == sidx:
-                    continue
-                if Point.distance_obj(first, second) <= self.instance.penalty_radius:
-                    num_overlaps += 1
+        for fidx in range(len(self.towers)):
+            num_overlaps = index.count_within(fidx, self.instance.penalty_radius)
             penalty += 170 * math.exp(0.17 * num_overlaps)
         return penalty
 
@@ -65,7 +82,7 @@ class Solution:
         assert num_towers_s is not None
         num_towers = int(num_towers_s)
 
-        towers = []
+        towers = PointArray()
         for line in lines_iter:
             towers.append(Point.parse(line))
         assert num_towers == len(towers)
@@ -74,6 +91,22 @@ class Solution:
         assert sol.valid()
         return sol
 
+    @staticmethod
+    def parse_bytes(data: bytes, instance: Instance, strict: bool = False):
+        """Parses the contents of an output file. Unless strict, all numbers
+        are converted in one pass, as in Instance.parse_bytes()."""
+        if strict:
+            return Solution.parse(data.decode().splitlines(), instance)
+        values = parse.read_ints(data)
+        assert len(values) >= 1
+        assert len(values) == 1 + 2 * values[0]
+
+        sol = Solution(
+            towers=PointArray.from_coords(values[1::2], values[2::2]),
+            instance=instance)
+        assert sol.valid()
+        return sol
+
     def serialize(self, out):
         print(len(self.towers), file=out)
         for tower in self.towers:
@@ -105,6 +105,32 @@ class TestParseSolution(unittest.TestCase):
             )
 
 
+class TestParseSolutionBytes(unittest.TestCase):
+    def setUp(self):
+        self.instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=9, y=0)],
+        )
+
+    def test_matches_parse(self):
+        data = b"# Penalty: 123\n2\n9 1\n3 4\n"
+        want = Solution.parse(data.decode().splitlines(), self.instance)
+        self.assertEqual(want, Solution.parse_bytes(data, self.instance))
+        self.assertEqual(want, Solution.parse_bytes(data, self.instance,
+                                                    strict=True))
+
+    def test_wrong_count(self):
+        for data in (b"3\n9 1\n3 4\n", b"", b"1\n9 1 2\n"):
+            with self.assertRaises(AssertionError):
+                Solution.parse_bytes(data, self.instance)
+
+    def test_doesnt_cover(self):
+        with self.assertRaises(AssertionError):
+            Solution.parse_bytes(b"1\n5 5\n", self.instance)
+
+
 class TestSolutionValidity(unittest.TestCase):
     def test_invalid_out_of_bounds(self):
         instance = Instance(
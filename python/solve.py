@@ -6,12 +6,23 @@ For usage, run `python3 solve.py --help`.
 """
 
 import argparse
+import hashlib
+import inspect
 from pathlib import Path
-from typing import Callable, Dict
+from typing import Any, Callable, Dict, List, Optional
 
 from instance import Instance
 from solution import Solution
 from file_wrappers import StdinFileWrapper, StdoutFileWrapper
+from greedy import solve_greedy
+from anneal import solve_anneal
+from exact import solve_exact
+from decompose import solve_decomposed
+from lns import solve_lns
+from portfolio import solve_portfolio
+from history import History, RunRecord, Usage, instance_name, measure, size_class
+from manifest import file_digest
+from warm_start import load_solution, load_warm_start
 
 
 def solve_naive(instance: Instance) -> Solution:
@@ -22,10 +33,67 @@ def solve_naive(instance: Instance) -> Solution:
 
 
 SOLVERS: Dict[str, Callable[[Instance], Solution]] = {
-    "naive": solve_naive
+    "naive": solve_naive,
+    "greedy": solve_greedy,
+    "anneal": solve_anneal,
+    "exact": solve_exact,
+    "decomposed": solve_decomposed,
+    "lns": solve_lns,
+    "portfolio": solve_portfolio,
 }
 
 
+def solver_kwargs(solver: Callable[..., Solution], **options: Any) -> Dict[str, Any]:
+    """Returns the options that were set and that the solver accepts as
+    keyword arguments.
+
+    >>> solver_kwargs(solve_anneal, seed=1, time_limit=None, missing=2)
+    {'seed': 1}
+    """
+    params = inspect.signature(solver).parameters
+    return {name: value for name, value in options.items()
+            if value is not None and name in params}
+
+
+def warm_start(args, instance: Instance) -> Optional[Solution]:
+    """Loads the solution to start from: --warm-start names either an output
+    file or an output root laid out like the inputs folder."""
+    if args.warm_start is None or args.input == "-":
+        return None
+    path = Path(args.warm_start)
+    if path.is_dir():
+        return load_warm_start(args.warm_start, Path(args.input), instance)
+    return load_solution(path, instance)
+
+
+def record_history(args, lines: List[str], instance: Instance,
+                   solution: Solution, usage: Usage) -> None:
+    """Appends the run to the --history database."""
+    if args.input == "-":
+        instance_hash = hashlib.sha256("".join(lines).encode()).hexdigest()
+        name = "-"
+    else:
+        instance_hash = file_digest(Path(args.input))
+        name = instance_name(Path(args.input))
+    params = {"time_limit": args.time_limit, "processes": args.processes,
+              "warm_start": args.warm_start}
+    with History(args.history) as history:
+        history.record([RunRecord(
+            source="solve",
+            instance_hash=instance_hash,
+            instance=name,
+            size=size_class(instance),
+            solver=args.solver,
+            params=params,
+            seed=args.seed,
+            penalty=solution.penalty(),
+            valid=solution.valid(),
+            wall_seconds=usage.wall_seconds,
+            cpu_seconds=usage.cpu_seconds,
+            peak_memory_kb=usage.peak_memory_kb,
+        )])
+
+
 # You shouldn't need to modify anything below this line.
 def infile(args):
     if args.input == "-":
@@ -43,10 +111,24 @@ def outfile(args):
 
 def main(args):
     with infile(args) as f:
-        instance = Instance.parse(f.readlines())
+        lines = f.readlines()
+        instance = Instance.parse(lines)
         solver = SOLVERS[args.solver]
-        solution = solver(instance)
+        initial = warm_start(args, instance)
+        with measure() as usage:
+            solution = solver(instance, **solver_kwargs(
+                solver,
+                time_limit=args.time_limit,
+                seed=args.seed,
+                verbose=args.verbose or None,
+                processes=args.processes,
+                initial=initial,
+            ))
         assert solution.valid()
+        if initial is not None and initial.penalty() < solution.penalty():
+            solution = initial
+        if args.history is not None:
+            record_history(args, lines, instance, solution, usage)
         with outfile(args) as g:
             print("# Penalty: ", solution.penalty(), file=g)
             solution.serialize(g)
@@ -61,4 +143,22 @@ if __name__ == "__main__":
     parser.add_argument("output", type=str,
                         help="The output file. Use - for stdout.",
                         default="-")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="Time budget in seconds for solvers that take "
+                        "one.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for randomized solvers.")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Number of worker processes for solvers that "
+                        "run in parallel. Default: number of CPU cores.")
+    parser.add_argument("--warm-start", type=str, default=None,
+                        help="An earlier output file, or output root such as "
+                        "the one merge.py writes, to start solvers that "
+                        "accept an initial solution from. The better of it "
+                        "and the new solution is written.")
+    parser.add_argument("--history", type=str, default=None,
+                        help="Path to an SQLite database to record the run "
+                        "in. See history.py.")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Report solver progress on stderr.")
     main(parser.parse_args())
@@ -8,18 +8,39 @@ To read all files from inputs and write to outputs, run
 
 
 import argparse
+import dataclasses
 import enum
 import multiprocessing
 import os
+import time
 from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
 from threading import BoundedSemaphore
 
+from bounds import lower_bound
+from history import (BATCH_SIZE, History, RunRecord, Usage, instance_name,
+                     measure, size_class)
 from instance import Instance
+from manifest import (file_digest, job_key, load_manifest, save_manifest,
+                      write_atomic)
+from parse import PENALTY_HEADER
+from schedule import estimate_costs, largest_first, makespan_report
 from solution import Solution
+from work_queue import WorkQueue, worker_name
 
 # Modify this line to import your own solvers.
 # YOUR CODE HERE
-from solve import solve_naive
+from greedy import solve_greedy
+from portfolio import solve_portfolio
+from solve import SOLVERS, solver_kwargs
+from warm_start import load_solution, load_warm_start, warm_start_digest
+from watchdog import JobTimeout, clear_checkpoint, last_checkpoint
+from watchdog import time_limit as job_deadline
+
+
+# Bump this whenever solver() changes, so that incremental runs re-solve
+# every instance.
+SOLVER_VERSION = 1
 
 
 class Size(enum.Enum):
@@ -28,15 +49,34 @@ class Size(enum.Enum):
     LARGE = "large"
 
 
-def solver(size: Size, instance: Instance) -> Solution:
+# Wall-clock seconds a solver may spend on one instance of each size before
+# its job falls back to the best solution known so far.
+DEFAULT_JOB_TIMEOUTS = {
+    Size.SMALL.value: 60.0,
+    Size.MEDIUM.value: 120.0,
+    Size.LARGE.value: 300.0,
+}
+
+
+def solver_name(size: Size, initial: Optional[Solution] = None) -> str:
+    """Returns the name of the solve.SOLVERS entry that solver() runs."""
     # Modify this function to use your imported solvers.
     # YOUR CODE HERE
+    if initial is not None:
+        return "anneal"
     if size == Size.SMALL:
-        return solve_naive(instance)
+        return "greedy"
     elif size == Size.MEDIUM:
-        return solve_naive(instance)
+        return "greedy"
     elif size == Size.LARGE:
-        return solve_naive(instance)
+        return "greedy"
+
+
+def solver(size: Size, instance: Instance, time_limit: float,
+           initial: Optional[Solution] = None) -> Solution:
+    run = SOLVERS[solver_name(size, initial)]
+    return run(instance, **solver_kwargs(run, time_limit=time_limit,
+                                         initial=initial))
 
 
 # You shouldn't need to modify anything below this line.
@@ -56,27 +96,224 @@ def traverse_files(inroot: str, outroot):
             yield (size, Path(inroot) / size / inf, Path(outroot) / size / outf)
 
 
+def best_is_optimal(instance: Instance, bestf: Path) -> bool:
+    """Returns whether the best known output is already provably optimal."""
+    best = load_solution(bestf, instance)
+    return best is not None and best.penalty() <= lower_bound(instance) + 1e-6
+
+
+def fallback(instance: Instance, initial: Optional[Solution]) -> Solution:
+    """Returns the best of the interrupted solver's last checkpoint and the
+    warm start, or the greedy solution if there is neither."""
+    candidates = [solution for solution in (last_checkpoint(instance), initial)
+                  if solution is not None and solution.valid()]
+    if not candidates:
+        return solve_greedy(instance)
+    return min(candidates, key=lambda solution: solution.penalty())
+
+
+def job_params(flags) -> dict:
+    """Returns the options that affect the solutions solve_one() finds."""
+    return {
+        "portfolio": flags.portfolio,
+        "time_limit": flags.time_limit,
+        "warm_start": flags.warm_start,
+        "job_timeouts": flags.job_timeouts,
+    }
+
+
+def run_record(inf: Path, instance: Instance, flags, name: str,
+               solution: Optional[Solution], usage: Usage) -> RunRecord:
+    """Describes a solve_one() run of the named solver for the --history
+    database."""
+    valid = solution is not None and solution.valid()
+    return RunRecord(
+        source="solve_all",
+        instance_hash=file_digest(inf),
+        instance=instance_name(inf),
+        size=size_class(instance),
+        solver=name,
+        params={**job_params(flags), "parallelism": flags.parallelism},
+        seed=None,
+        penalty=solution.penalty() if valid else None,
+        valid=valid,
+        wall_seconds=usage.wall_seconds,
+        cpu_seconds=usage.cpu_seconds,
+        peak_memory_kb=usage.peak_memory_kb,
+    )
+
+
 def solve_one(args):
-    size, inf, outf = args
+    """Solves one input and returns its manifest name, its manifest entry,
+    the seconds it took and its RunRecord. The entry is None if there is no
+    output for the input, and the record is None if nothing was solved."""
+    size, inf, outf, flags, key, cached = args
+    name = f"{size}/{outf.stem}"
+    start = time.perf_counter()
+    instance = None
+    used = None
     try:
-        with open(inf) as f:
-            instance = Instance.parse(f.readlines())
+        instance = Instance.parse_bytes(Path(inf).read_bytes())
         assert instance.valid()
 
-        solution = solver(Size(size), instance)
+        if cached is not None:
+            existing = load_solution(outf, instance)
+            if existing is not None:
+                print(f"{str(inf)}: output is up to date, skipping")
+                # Keep the runtime of the run that produced the output.
+                return name, {**cached, "penalty": existing.penalty()}, \
+                    time.perf_counter() - start, None
+
+        if flags.best is not None and best_is_optimal(
+                instance, Path(flags.best) / size / outf.name):
+            print(f"{str(inf)}: best output is optimal, skipping")
+            return name, None, time.perf_counter() - start, None
+
+        initial = load_warm_start(flags.warm_start, inf, instance)
+        used = "portfolio" if flags.portfolio \
+            else solver_name(Size(size), initial)
+        clear_checkpoint()
+        timed_out = False
+        try:
+            with measure() as usage, job_deadline(flags.job_timeouts.get(size)):
+                if flags.portfolio:
+                    solution = solve_portfolio(
+                        instance, time_limit=flags.time_limit,
+                        processes=flags.parallelism, initial=initial)
+                else:
+                    solution = solver(Size(size), instance, flags.time_limit,
+                                      initial)
+        except JobTimeout as e:
+            solution = fallback(instance, initial)
+            timed_out = True
+            print(f"{str(inf)}: {e}, using the best solution so far")
         assert solution.valid()
+        if initial is not None and initial.penalty() < solution.penalty():
+            solution = initial
 
-        with outf.open('w') as f:
-            solution.serialize(f)
+        # Written atomically so that an interrupted run leaves no partial
+        # output behind. merge.py ranks outputs by the penalty header.
+        write_atomic(outf, f"{PENALTY_HEADER} {solution.penalty()}\n"
+                     f"{solution.serialize_to_string()}\n")
 
     except Exception as e:
         print(f"{size} job failed ({inf}):", e)
+        seconds = time.perf_counter() - start
+        record = None
+        if flags.history is not None and used is not None:
+            # Failed runs are recorded too, as they count against a solver.
+            record = run_record(inf, instance, flags, used, None,
+                                Usage(wall_seconds=seconds))
+        return name, None, seconds, record
     else:
-        print(f"{str(inf)}: solution found with penalty", solution.penalty())
+        seconds = time.perf_counter() - start
+        penalty = solution.penalty()
+        gap = max(penalty - lower_bound(instance), 0.0)
+        print(f"{str(inf)}: solution found with penalty {penalty} (gap {gap:.3f}) "
+              f"in {seconds:.2f}s", flush=True)
+        entry = {"key": key, "penalty": penalty, "seconds": seconds}
+        if timed_out:
+            entry["timed_out"] = True
+        record = None
+        if flags.history is not None:
+            record = run_record(inf, instance, flags, used, solution, usage)
+        return name, entry, seconds, record
 
 
-def main(args):
-    outroot = Path(args.outputs)
+# Seconds a queued job may run past its timeout before its lease expires and
+# another worker retries it.
+LEASE_SLACK = 120.0
+
+# Seconds between polls of the work queue.
+POLL_SECONDS = 1.0
+
+
+def _absolute(path: Optional[str]) -> Optional[str]:
+    return None if path is None else str(Path(path).resolve())
+
+
+def queue_job(job) -> Tuple[str, Dict[str, Any], float]:
+    """Returns the name, JSON payload and lease seconds of a solve_one() job
+    for the work queue. Paths are made absolute, as workers may run in other
+    directories."""
+    size, inf, outf, flags, key, cached = job
+    payload = {
+        "size": size, "inf": _absolute(inf), "outf": _absolute(outf),
+        "key": key, "cached": cached,
+        "flags": {**job_params(flags),
+                  "warm_start": _absolute(flags.warm_start),
+                  "best": _absolute(flags.best),
+                  "history": _absolute(flags.history)},
+    }
+    timeout = flags.job_timeouts.get(size, flags.time_limit)
+    return f"{size}/{outf.stem}", payload, timeout + LEASE_SLACK
+
+
+def dequeue_job(payload: Dict[str, Any], parallelism: int):
+    """Rebuilds the solve_one() job of a queue payload."""
+    flags = argparse.Namespace(parallelism=parallelism, **payload["flags"])
+    return (payload["size"], Path(payload["inf"]), Path(payload["outf"]),
+            flags, payload["key"], payload["cached"])
+
+
+def work(queue_path: str, parallelism: int) -> int:
+    """Solves jobs leased from the queue until every job in it is finished,
+    and returns how many it solved. Waits for jobs until it sees one that is
+    unfinished, so that a finished earlier run in the queue is ignored.
+
+    Jobs whose worker dies or stalls are retried once their lease expires.
+    Jobs that fail with an error are not, as retrying would fail again.
+    """
+    owner = worker_name()
+    solved = 0
+    joined = False
+    with WorkQueue(queue_path) as queue:
+        while True:
+            lease = queue.lease(owner)
+            if lease is None:
+                if queue.unfinished() > 0:
+                    joined = True
+                elif joined:
+                    return solved
+                time.sleep(POLL_SECONDS)
+                continue
+            joined = True
+            try:
+                _, entry, seconds, run = solve_one(
+                    dequeue_job(lease.payload, parallelism))
+            except BaseException:
+                queue.release(lease, owner)
+                raise
+            queue.complete(lease, owner, {
+                "entry": entry, "seconds": seconds,
+                "run": None if run is None else dataclasses.asdict(run),
+            })
+            solved += 1
+
+
+def coordinate(queue_path: str, jobs) -> Iterator[tuple]:
+    """Replaces the jobs in the queue with the solve_one() jobs and yields
+    their results as workers finish them."""
+    with WorkQueue(queue_path) as queue:
+        queue.reset(queue_job(job) for job in jobs)
+        while True:
+            # Counted before collecting, so that no job finishes unseen.
+            unfinished = queue.unfinished()
+            for name, done, result in queue.collect():
+                if not done:
+                    print(f"{name}: abandoned after {queue.max_attempts} "
+                          "expired leases")
+                    yield name, None, 0.0, None
+                    continue
+                run = result["run"]
+                yield (name, result["entry"], result["seconds"],
+                       None if run is None else RunRecord(**run))
+            if unfinished == 0:
+                return
+            time.sleep(POLL_SECONDS)
+
+
+def make_output_dirs(outroot: Path) -> None:
     try:
         outroot.mkdir(exist_ok=False)
         (outroot / Size.SMALL.value).mkdir(exist_ok=False)
@@ -87,11 +324,95 @@ def main(args):
         print("Output directory or subdirectory already exists!")
         print("Cowardly refusing to overwrite output files.")
         print("Move the output directory or write to a different folder.")
+        print("Pass --incremental to only re-solve outdated outputs.")
         print("===================== ERROR =====================")
         raise e
 
-    with multiprocessing.Pool(args.parallelism) as pool:
-        pool.map(solve_one, traverse_files(args.inputs, args.outputs))
+
+def main(args):
+    if args.worker:
+        if args.portfolio:
+            solved = work(args.queue, args.parallelism)
+        else:
+            with multiprocessing.Pool(args.parallelism) as pool:
+                solved = sum(pool.starmap(
+                    work, [(args.queue, 1)] * args.parallelism))
+        print(f"Worker finished after solving {solved} jobs.")
+        return
+
+    outroot = Path(args.outputs)
+    if args.incremental:
+        for size in Size:
+            (outroot / size.value).mkdir(parents=True, exist_ok=True)
+    else:
+        make_output_dirs(outroot)
+
+    # Outputs are up to date if they were solved from the same input
+    # contents with the same solver and options.
+    manifest = load_manifest(outroot) if args.incremental else {}
+    solver_name = "portfolio" if args.portfolio else "solve_all"
+    params = job_params(args)
+    jobs = []
+    history = []
+    for size, inf, outf in traverse_files(args.inputs, args.outputs):
+        # The warm start is keyed by the contents of the output it reads.
+        key = job_key(inf, solver_name, SOLVER_VERSION, {
+            **params, "warm_start": warm_start_digest(args.warm_start, inf)})
+        entry = manifest.get(f"{size}/{outf.stem}", {})
+        # Up-to-date jobs carry their manifest entry.
+        cached = entry if entry.get("key") == key else None
+        jobs.append((size, inf, outf, args, key, cached))
+        history.append((size, inf, entry.get("seconds")))
+
+    # Up-to-date jobs are nearly free, and the rest run largest first.
+    costs = [0.0 if job[5] is not None else cost
+             for job, cost in zip(jobs, estimate_costs(history))]
+    jobs = largest_first(jobs, costs)
+
+    start = time.perf_counter()
+    job_seconds = []
+    runs = []
+
+    def _record(results):
+        for name, entry, seconds, run in results:
+            job_seconds.append(seconds)
+            if entry is None:
+                manifest.pop(name, None)
+            else:
+                manifest[name] = entry
+            if run is not None:
+                runs.append(run)
+            if len(job_seconds) % BATCH_SIZE == 0:
+                _flush()
+
+    def _flush():
+        # The manifest and runs are saved in batches, as the manifest is
+        # rewritten whole and every transaction syncs the database. An
+        # interrupted run resumes from the last batch.
+        save_manifest(outroot, manifest)
+        if runs:
+            with History(args.history) as run_history:
+                run_history.record(runs)
+            runs.clear()
+
+    try:
+        if args.queue is not None:
+            _record(coordinate(args.queue, jobs))
+            with WorkQueue(args.queue) as queue:
+                workers = max(queue.owners(), 1)
+        elif args.portfolio:
+            # Each instance gets all the cores in turn. Pool workers cannot
+            # start processes of their own, so the instances run in this
+            # process.
+            _record(map(solve_one, jobs))
+            workers = 1
+        else:
+            with multiprocessing.Pool(args.parallelism) as pool:
+                _record(pool.imap_unordered(solve_one, jobs, chunksize=1))
+            workers = args.parallelism
+    finally:
+        _flush()
+    print(makespan_report(time.perf_counter() - start, job_seconds, workers))
 
 
 if __name__ == "__main__":
@@ -103,7 +424,52 @@ if __name__ == "__main__":
                         help="Path to the outputs (write) folder.")
     parser.add_argument("--parallelism", type=int,
                         help="Number of processes to spawn. Default: number of CPU cores.", default=None)
+    parser.add_argument("--best", type=str, default=None,
+                        help="Path to the best outputs so far, e.g. the folder "
+                        "merge.py writes to. Instances whose best output "
+                        "matches the lower bound are skipped.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse an existing outputs folder, only solving "
+                        "inputs whose output is missing, invalid or was "
+                        "solved from different input contents or options. "
+                        "Interrupted runs resume where they stopped.")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="Solve one instance at a time with the portfolio "
+                        "solver, racing --parallelism workers on it.")
+    parser.add_argument("--time-limit", type=float, default=10.0,
+                        help="Seconds per instance for solvers that take a "
+                        "time budget.")
+    parser.add_argument("--job-timeout", type=str, action="append",
+                        default=[], metavar="SIZE=SECONDS",
+                        help="Wall-clock budget per instance of a size class, "
+                        "after which the best solution found so far is "
+                        "written. Repeatable. Defaults: " + ", ".join(
+                            f"{size}={seconds:g}" for size, seconds
+                            in DEFAULT_JOB_TIMEOUTS.items()))
+    parser.add_argument("--warm-start", type=str, default=None,
+                        help="Path to earlier outputs, e.g. the folder "
+                        "merge.py writes to. Existing solutions are improved "
+                        "instead of solving from scratch.")
+    parser.add_argument("--history", type=str, default=None,
+                        help="Path to an SQLite database to record every "
+                        "solved instance in. See history.py.")
+    parser.add_argument("--queue", type=str, default=None,
+                        help="Path to an SQLite work queue on a disk shared "
+                        "by all machines. Jobs are put in the queue for "
+                        "workers to solve instead of being solved here.")
+    parser.add_argument("--worker", action="store_true",
+                        help="Solve jobs from --queue with --parallelism "
+                        "processes until it is finished. Start workers with "
+                        "the same options as the run that fills the queue.")
     args = parser.parse_args()
+    assert args.queue is not None or not args.worker, \
+        "--worker needs a --queue!"
+
+    args.job_timeouts = dict(DEFAULT_JOB_TIMEOUTS)
+    for budget in args.job_timeout:
+        size, _, seconds = budget.partition("=")
+        assert size in args.job_timeouts, f"Unknown size {size!r}!"
+        args.job_timeouts[size] = float(seconds)
 
     if args.parallelism is None:
         args.parallelism = multiprocessing.cpu_count()
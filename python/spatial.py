@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from point import Point
+from point_array import coords
+
+
+class SpatialHash:
+    """Buckets points into square grid cells of a fixed side length.
+
+    Any two points within distance cell_size of each other live in the same
+    bucket or in adjacent buckets, so a radius query only needs to inspect the
+    3x3 block of buckets around the query point instead of every point.
+    Unlike coverage, which looks up grid cells through a disc stencil, radius
+    queries over sparse points stay cheaper with buckets.
+
+    >>> index = SpatialHash([Point(0, 0), Point(1, 1), Point(9, 9)], 2)
+    >>> sorted(index.candidates(Point(0, 0)))
+    [0, 1]
+    """
+
+    def __init__(self, points: Sequence[Point], cell_size: int):
+        self.points = points
+        self.cell_size = max(cell_size, 1)
+        # Coordinates are read directly, so that points in a PointArray are
+        # never materialized.
+        self._xs, self._ys = coords(points)
+        self._buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        size = self.cell_size
+        for idx, (x, y) in enumerate(zip(self._xs, self._ys)):
+            self._buckets[x // size, y // size].append(idx)
+
+    def _key(self, point: Point) -> Tuple[int, int]:
+        return (point.x // self.cell_size, point.y // self.cell_size)
+
+    def candidates(self, point: Point) -> Iterator[int]:
+        """Yields the indices of all points that may be within cell_size of
+        the given point, in bucket order."""
+        return self._candidates(point.x // self.cell_size,
+                                point.y // self.cell_size)
+
+    def _candidates(self, bx: int, by: int) -> Iterator[int]:
+        for cx in (bx - 1, bx, bx + 1):
+            for cy in (by - 1, by, by + 1):
+                bucket = self._buckets.get((cx, cy))
+                if bucket is not None:
+                    yield from bucket
+
+    def count_within(self, idx: int, radius: int) -> int:
+        """Counts the other points within the given radius of the point at
+        index idx. The radius must not exceed cell_size."""
+        assert radius <= self.cell_size
+        radius_sq = radius * radius
+        xs, ys = self._xs, self._ys
+        x, y = xs[idx], ys[idx]
+        count = 0
+        for other in self._candidates(x // self.cell_size,
+                                      y // self.cell_size):
+            dx = xs[other] - x
+            dy = ys[other] - y
+            if other != idx and dx * dx + dy * dy <= radius_sq:
+                count += 1
+        return count
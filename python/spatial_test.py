@@ -0,0 +1,60 @@
+import math
+import random
+import unittest
+
+from instance import Instance
+from point import Point
+from solution import Solution
+from spatial import SpatialHash
+
+
+def _brute_force_penalty(towers, penalty_radius):
+    penalty = 0
+    for fidx, first in enumerate(towers):
+        num_overlaps = 0
+        for sidx, second in enumerate(towers):
+            if fidx == sidx:
+                continue
+            if Point.distance_obj(first, second) <= penalty_radius:
+                num_overlaps += 1
+        penalty += 170 * math.exp(0.17 * num_overlaps)
+    return penalty
+
+
+class TestSpatialHash(unittest.TestCase):
+    def test_candidates_adjacent_buckets(self):
+        index = SpatialHash([Point(0, 0), Point(3, 3), Point(6, 6)], 3)
+        self.assertEqual([0, 1], sorted(index.candidates(Point(0, 0))))
+        self.assertEqual([0, 1, 2], sorted(index.candidates(Point(3, 3))))
+
+    def test_count_within(self):
+        index = SpatialHash(
+            [Point(0, 0), Point(0, 2), Point(2, 2), Point(0, 0)], 2)
+        self.assertEqual(2, index.count_within(0, 2))
+        self.assertEqual(3, index.count_within(1, 2))
+        self.assertEqual(1, index.count_within(2, 2))
+
+    def test_zero_cell_size(self):
+        index = SpatialHash([Point(1, 1), Point(1, 1), Point(1, 2)], 0)
+        self.assertEqual(1, index.count_within(0, 0))
+
+    def test_penalty_matches_brute_force(self):
+        rng = random.Random(170)
+        for penalty_radius in (0, 1, 2, 8, 14):
+            towers = [Point(rng.randrange(100), rng.randrange(100))
+                      for _ in range(300)]
+            instance = Instance(
+                grid_side_length=100,
+                coverage_radius=3,
+                penalty_radius=penalty_radius,
+                cities=[],
+            )
+            solution = Solution(towers=towers, instance=instance)
+            self.assertEqual(
+                _brute_force_penalty(towers, penalty_radius),
+                solution.penalty(),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import functools
+from typing import Iterator, Tuple
+
+from point import Point
+
+Offsets = Tuple[Tuple[int, int], ...]
+
+
+@functools.lru_cache(maxsize=None)
+def disc_offsets(radius: int) -> Offsets:
+    """Returns the integer (dx, dy) offsets at most radius away from the
+    origin, ordered by row and then by column.
+
+    The result is cached, so every caller with the same radius shares one
+    tuple.
+
+    >>> disc_offsets(1)
+    ((0, -1), (-1, 0), (0, 0), (1, 0), (0, 1))
+    >>> len(disc_offsets(3))
+    29
+    """
+    return tuple(
+        (dx, dy)
+        for dy in range(-radius, radius + 1)
+        for dx in range(-radius, radius + 1)
+        if dx * dx + dy * dy <= radius * radius
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def crescent_offsets(radius: int, dx: int, dy: int) -> Offsets:
+    """Returns the offsets of disc_offsets(radius) that are more than radius
+    away from (dx, dy), in the same order.
+
+    These are the cells near the origin that are not near (dx, dy), so
+    scanning them is enough to compare the neighborhoods of two nearby cells.
+
+    >>> crescent_offsets(1, 1, 0)
+    ((0, -1), (-1, 0), (0, 1))
+    """
+    r_sq = radius * radius
+    return tuple(
+        (ox, oy) for ox, oy in disc_offsets(radius)
+        if (ox - dx) ** 2 + (oy - dy) ** 2 > r_sq
+    )
+
+
+def points_in_disc(center: Point, offsets: Offsets,
+                   grid_side_length: int) -> Iterator[Point]:
+    """Yields the grid points of a disc stencil around center, clipped to the
+    grid bounds.
+
+    >>> list(points_in_disc(Point(0, 0), disc_offsets(1), 10))
+    [Point(x=0, y=0), Point(x=1, y=0), Point(x=0, y=1)]
+    """
+    D = grid_side_length
+    cx = center.x
+    cy = center.y
+    for dx, dy in offsets:
+        x = cx + dx
+        y = cy + dy
+        if 0 <= x < D and 0 <= y < D:
+            yield Point(x, y)
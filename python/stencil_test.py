@@ -0,0 +1,50 @@
+import unittest
+
+from instance import Instance
+from point import Point
+from size import Size
+from stencil import crescent_offsets, disc_offsets, points_in_disc
+
+
+class TestStencil(unittest.TestCase):
+    def test_disc_offsets_match_distance(self):
+        for radius in (0, 1, 3, 8, 10, 14):
+            want = sorted(
+                (dx, dy)
+                for dx in range(-20, 21)
+                for dy in range(-20, 21)
+                if Point.distance_obj(Point(0, 0), Point(dx, dy)) <= radius
+            )
+            self.assertEqual(want, sorted(disc_offsets(radius)))
+
+    def test_disc_offsets_cached(self):
+        self.assertIs(disc_offsets(8), disc_offsets(8))
+
+    def test_crescent_offsets(self):
+        for dx, dy in ((1, 0), (2, -1), (0, 0), (20, 0)):
+            want = set(disc_offsets(8)) - {
+                (ox + dx, oy + dy) for ox, oy in disc_offsets(8)}
+            self.assertEqual(want, set(crescent_offsets(8, dx, dy)))
+
+    def test_points_in_disc_clipped(self):
+        points = list(points_in_disc(Point(9, 9), disc_offsets(1), 10))
+        self.assertEqual([Point(9, 8), Point(8, 9), Point(9, 9)], points)
+
+    def test_size_offsets(self):
+        self.assertIs(disc_offsets(3), Size.SMALL.coverage_offsets)
+        self.assertIs(disc_offsets(8), Size.SMALL.penalty_offsets)
+        self.assertIs(disc_offsets(14), Size.LARGE.penalty_offsets)
+
+    def test_instance_offsets(self):
+        instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=9, y=0)],
+        )
+        self.assertEqual(5, len(instance.coverage_offsets))
+        self.assertEqual(13, len(instance.penalty_offsets))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Optional NumPy backend for validating and scoring solutions.
+
+Solution.valid() and Solution.penalty() dispatch here when NumPy can be
+imported. Set ENABLED to False to force the pure Python implementations.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Sequence, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from point import Point
+from point_array import PointArray
+
+if TYPE_CHECKING:
+    from instance import Instance
+
+ENABLED = np is not None
+
+# Number of towers compared against all others at once in overlap_counts.
+_CHUNK = 1024
+
+
+def coords(points: Sequence[Point]):
+    """Returns the x and y coordinates of the points as int32 arrays."""
+    if isinstance(points, PointArray):
+        return (np.frombuffer(points.xs, dtype=np.intc).astype(np.int32),
+                np.frombuffer(points.ys, dtype=np.intc).astype(np.int32))
+    xs = np.fromiter((p.x for p in points), dtype=np.int32, count=len(points))
+    ys = np.fromiter((p.y for p in points), dtype=np.int32, count=len(points))
+    return xs, ys
+
+
+def _within(first, second, radius: int):
+    """Returns the boolean matrix of which points of first are within radius
+    of which points of second."""
+    dx = first[0][:, None] - second[0][None, :]
+    dy = first[1][:, None] - second[1][None, :]
+    return dx * dx + dy * dy <= radius * radius
+
+
+def overlap_counts(towers, penalty_radius: int) -> List[int]:
+    """Counts, for each tower, the other towers within the penalty radius.
+
+    towers is a pair of coordinate arrays as returned by coords().
+    """
+    xs, ys = towers
+    counts = np.empty(len(xs), dtype=np.int64)
+    for start in range(0, len(xs), _CHUNK):
+        block = (xs[start:start + _CHUNK], ys[start:start + _CHUNK])
+        # Every tower is within range of itself.
+        counts[start:start + _CHUNK] = \
+            _within(block, towers, penalty_radius).sum(axis=1) - 1
+    return counts.tolist()
+
+
+def penalty(towers: Sequence[Point], instance: Instance) -> float:
+    penalty = 0
+    # Summing in tower order keeps the result identical to the Python path.
+    for num_overlaps in overlap_counts(coords(towers), instance.penalty_radius):
+        penalty += 170 * math.exp(0.17 * num_overlaps)
+    return penalty
+
+
+def valid(towers: Sequence[Point], instance: Instance) -> bool:
+    D = instance.grid_side_length
+    tower_xs, tower_ys = coords(towers)
+    if (tower_xs < 0).any() or (tower_xs >= D).any() \
+            or (tower_ys < 0).any() or (tower_ys >= D).any():
+        return False
+
+    keys = tower_ys.astype(np.int64) * D + tower_xs
+    if len(instance.cities):
+        # A city is covered if any of the cells covering it, as listed in the
+        # instance's coverage index, holds a tower.
+        index = instance.coverage_index()
+        indptr = np.frombuffer(index.city_indptr, dtype=np.int32)
+        if (np.diff(indptr) == 0).any():
+            return False
+        entries = np.frombuffer(index.cells, dtype=np.int32)[
+            np.frombuffer(index.city_cells, dtype=np.int32)]
+        hit = np.isin(entries, keys)
+        if not np.logical_or.reduceat(hit, indptr[:-1]).all():
+            return False
+
+    return len(np.unique(keys)) == len(keys)
@@ -0,0 +1,50 @@
+import random
+import unittest
+from unittest import mock
+
+from instance import Instance
+from point import Point
+from solution import Solution
+import vectorized
+
+
+@unittest.skipUnless(vectorized.np is not None, "NumPy is not installed")
+class TestVectorized(unittest.TestCase):
+    def compare(self, solution):
+        with mock.patch.object(vectorized, "ENABLED", False):
+            want_valid = solution.valid()
+            want_penalty = solution.penalty()
+        with mock.patch.object(vectorized, "ENABLED", True):
+            self.assertEqual(want_valid, solution.valid())
+            self.assertEqual(want_penalty, solution.penalty())
+
+    def test_matches_python(self):
+        rng = random.Random(170)
+        for _ in range(50):
+            cities = list({Point(rng.randrange(30), rng.randrange(30))
+                           for _ in range(20)})
+            instance = Instance(30, 3, 8, cities)
+            towers = [Point(c.x + rng.randint(-2, 2), c.y + rng.randint(-2, 2))
+                      for c in cities if rng.random() < 0.9]
+            self.compare(Solution(towers=towers, instance=instance))
+
+    def test_edge_cases(self):
+        instance = Instance(10, 1, 2, [Point(9, 0)])
+        self.compare(Solution(towers=[], instance=instance))
+        self.compare(Solution(towers=[Point(10, 0)], instance=instance))
+        self.compare(Solution(towers=[Point(-1, 0)], instance=instance))
+        self.compare(Solution(towers=[Point(9, 1), Point(9, 1)],
+                              instance=instance))
+        self.compare(Solution(towers=[Point(9, 1)], instance=instance))
+        self.compare(Solution(towers=[], instance=Instance(10, 1, 2, [])))
+
+    def test_overlap_counts_chunked(self):
+        towers = [Point(i % 40, i // 40) for i in range(1600)]
+        with mock.patch.object(vectorized, "_CHUNK", 7):
+            counts = vectorized.overlap_counts(vectorized.coords(towers), 1)
+        self.assertEqual(2, counts[0])
+        self.assertEqual(4, counts[41])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Loads earlier outputs so that solvers can improve on them."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+from instance import Instance
+from manifest import file_digest
+from solution import Solution
+
+
+def output_path(outroot: Path, inf: Path) -> Path:
+    """Returns where an output root keeps the output for an input file,
+    following the inputs/<size>/<name>.in -> outputs/<size>/<name>.out layout.
+
+    >>> output_path(Path("best"), Path("inputs/small/001.in")).as_posix()
+    'best/small/001.out'
+    """
+    return Path(outroot) / Path(inf).parent.name / f"{Path(inf).stem}.out"
+
+
+def load_solution(outf: Path, instance: Instance) -> Optional[Solution]:
+    """Returns the solution in an output file, or None if the file is
+    missing, malformed or not a valid solution for the instance."""
+    try:
+        solution = Solution.parse_bytes(Path(outf).read_bytes(), instance)
+    except (OSError, ValueError, AssertionError, StopIteration):
+        return None
+    return solution if solution.valid() else None
+
+
+def load_warm_start(outroot: Optional[str], inf: Path,
+                    instance: Instance) -> Optional[Solution]:
+    """Returns the solution for an input file in an output root, if any."""
+    if outroot is None:
+        return None
+    return load_solution(output_path(Path(outroot), inf), instance)
+
+
+def warm_start_digest(outroot: Optional[str], inf: Path) -> Optional[str]:
+    """Returns the digest of the output load_warm_start() reads for an input
+    file, or None if there is none."""
+    if outroot is None:
+        return None
+    try:
+        return file_digest(output_path(Path(outroot), inf))
+    except OSError:
+        return None
@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from instance import Instance
+from point import Point
+from solution import Solution
+from warm_start import (load_solution, load_warm_start, output_path,
+                        warm_start_digest)
+
+
+class TestWarmStart(unittest.TestCase):
+    def setUp(self):
+        self.instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1)],
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "small").mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, text):
+        outf = self.root / "small" / "001.out"
+        outf.write_text(text)
+        return outf
+
+    def test_output_path(self):
+        self.assertEqual(self.root / "small" / "001.out",
+                         output_path(self.root, Path("inputs/small/001.in")))
+
+    def test_load(self):
+        solution = Solution(towers=[Point(x=2, y=1)], instance=self.instance)
+        outf = self._write("# Penalty: 170\n" + solution.serialize_to_string())
+        self.assertEqual(solution.towers,
+                         load_solution(outf, self.instance).towers)
+        self.assertEqual(
+            solution.towers,
+            load_warm_start(str(self.root), Path("inputs/small/001.in"),
+                            self.instance).towers)
+
+    def test_missing(self):
+        self.assertIsNone(load_warm_start(
+            str(self.root), Path("inputs/small/002.in"), self.instance))
+        self.assertIsNone(load_warm_start(
+            None, Path("inputs/small/001.in"), self.instance))
+
+    def test_invalid(self):
+        # Leaves the city at (3, 1) uncovered.
+        self.assertIsNone(load_solution(self._write("1\n1 1\n"), self.instance))
+        self.assertIsNone(load_solution(self._write("2\n1 1\n"), self.instance))
+        self.assertIsNone(load_solution(self._write("1\nx y\n"), self.instance))
+
+
+    def test_digest(self):
+        inf = Path("inputs/small/001.in")
+        self.assertIsNone(warm_start_digest(str(self.root), inf))
+        self.assertIsNone(warm_start_digest(None, inf))
+        self._write("1\n2 1\n")
+        first = warm_start_digest(str(self.root), inf)
+        self._write("1\n3 1\n")
+        self.assertNotEqual(first, warm_start_digest(str(self.root), inf))
+
+if __name__ == "__main__":
+    unittest.main()
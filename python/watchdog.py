@@ -0,0 +1,63 @@
+"""Bounds the wall-clock time of solver calls and keeps their progress."""
+
+from __future__ import annotations
+
+import contextlib
+import signal
+from typing import Iterator, Optional, Sequence
+
+from instance import Instance
+from point import Point
+from solution import Solution
+
+
+class JobTimeout(Exception):
+    """Raised in the solving thread when its time budget runs out."""
+
+
+@contextlib.contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """Raises JobTimeout inside the block once seconds have passed.
+
+    Uses SIGALRM, so it only works in the main thread of a process, such as
+    a pool worker, and does nothing on platforms without it. Code blocked in
+    a single long C call is only interrupted when the call returns.
+    """
+    if seconds is None or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def _raise(signum, frame):
+        raise JobTimeout(f"timed out after {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# The best towers a solver in this process has reported, and their instance.
+_checkpoint_instance: Optional[Instance] = None
+_checkpoint_towers: Sequence[Point] = ()
+
+
+def checkpoint(instance: Instance, towers: Sequence[Point]) -> None:
+    """Records the best valid towers found so far for an instance. The
+    towers must not be modified afterwards."""
+    global _checkpoint_instance, _checkpoint_towers
+    _checkpoint_instance = instance
+    _checkpoint_towers = towers
+
+
+def clear_checkpoint() -> None:
+    checkpoint(None, ())
+
+
+def last_checkpoint(instance: Instance) -> Optional[Solution]:
+    """Returns the last checkpoint recorded for the instance, if any."""
+    if _checkpoint_instance is not instance:
+        return None
+    return Solution(towers=list(_checkpoint_towers), instance=instance)
@@ -0,0 +1,55 @@
+import time
+import unittest
+
+from anneal import anneal
+from instance import Instance
+from point import Point
+from watchdog import (JobTimeout, checkpoint, clear_checkpoint,
+                      last_checkpoint, time_limit)
+
+
+class TestWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.instance = Instance(
+            grid_side_length=10,
+            coverage_radius=1,
+            penalty_radius=2,
+            cities=[Point(x=1, y=1), Point(x=3, y=1), Point(x=8, y=8)],
+        )
+        clear_checkpoint()
+
+    def test_time_limit(self):
+        start = time.perf_counter()
+        with self.assertRaises(JobTimeout):
+            with time_limit(0.1):
+                while True:
+                    pass
+        self.assertLess(time.perf_counter() - start, 5)
+
+    def test_time_limit_not_reached(self):
+        with time_limit(5):
+            pass
+        with time_limit(None):
+            pass
+        # The timer is cancelled on exit.
+        time.sleep(0.2)
+
+    def test_checkpoint(self):
+        self.assertIsNone(last_checkpoint(self.instance))
+        checkpoint(self.instance, [Point(x=2, y=1), Point(x=8, y=8)])
+        self.assertEqual([Point(x=2, y=1), Point(x=8, y=8)],
+                         last_checkpoint(self.instance).towers)
+        other = Instance(grid_side_length=10, coverage_radius=1,
+                         penalty_radius=2, cities=[])
+        self.assertIsNone(last_checkpoint(other))
+
+    def test_interrupted_anneal_leaves_checkpoint(self):
+        with self.assertRaises(JobTimeout):
+            with time_limit(0.2):
+                anneal(self.instance, time_limit=60)
+        solution = last_checkpoint(self.instance)
+        self.assertTrue(solution.valid())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""A queue of batch jobs that workers on several machines lease from.
+
+The queue is an SQLite database, so any folder that all machines can reach
+works as the shared medium. Every lease expires after the job's lease time,
+after which another worker may retry the job, and a job is abandoned after
+max_attempts leases. Clocks of the machines must be roughly in sync.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    lease_seconds REAL NOT NULL,
+    -- pending, leased, done or failed.
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    collected INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+# Seconds a connection waits for another one to release the database.
+_BUSY_TIMEOUT = 60.0
+
+
+def worker_name() -> str:
+    """Returns a name that identifies this process among all workers."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclasses.dataclass
+class Lease:
+    id: int
+    name: str
+    payload: Dict[str, Any]
+    # Leases of the same job are told apart by their attempt.
+    attempt: int
+
+
+class WorkQueue:
+    """An SQLite database of jobs, each a JSON payload with a name."""
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        assert max_attempts > 0
+        self.max_attempts = max_attempts
+        # Transactions are started explicitly, so that leasing a job locks
+        # the database before reading which jobs are free.
+        self.connection = sqlite3.connect(path, timeout=_BUSY_TIMEOUT,
+                                          isolation_level=None)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> WorkQueue:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def reset(self, jobs: Iterable[Tuple[str, Dict[str, Any], float]]) -> None:
+        """Replaces the jobs in the queue with (name, payload, lease seconds)
+        jobs, to be leased in the given order. Results of replaced jobs that
+        are still running are discarded."""
+        with self._transaction():
+            self.connection.execute("DELETE FROM jobs")
+            self.connection.executemany(
+                "INSERT INTO jobs (name, payload, lease_seconds) "
+                "VALUES (?, ?, ?)",
+                [(name, json.dumps(payload), seconds)
+                 for name, payload, seconds in jobs])
+
+    def _expire(self, now: float) -> None:
+        self.connection.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' "
+            "ELSE 'pending' END, owner = NULL, lease_expires = NULL "
+            "WHERE state = 'leased' AND lease_expires <= ?",
+            (self.max_attempts, now))
+
+    def lease(self, owner: str, now: Optional[float] = None) -> Optional[Lease]:
+        """Leases the first pending job to owner, or returns None if no job
+        is pending. Expired leases are returned to the queue first."""
+        now = time.time() if now is None else now
+        with self._transaction():
+            self._expire(now)
+            row = self.connection.execute(
+                "SELECT id, name, payload, attempts FROM jobs "
+                "WHERE state = 'pending' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            job_id, name, payload, attempts = row
+            self.connection.execute(
+                "UPDATE jobs SET state = 'leased', attempts = ?, owner = ?, "
+                "lease_expires = ? + lease_seconds WHERE id = ?",
+                (attempts + 1, owner, now, job_id))
+        return Lease(job_id, name, json.loads(payload), attempts + 1)
+
+    def complete(self, lease: Lease, owner: str, result: Any) -> bool:
+        """Stores the JSON result of a leased job. Returns False, discarding
+        the result, if the job has since been leased to someone else."""
+        with self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE jobs SET state = 'done', result = ?, "
+                "lease_expires = NULL WHERE id = ? AND state = 'leased' AND "
+                "owner = ? AND attempts = ?",
+                (json.dumps(result), lease.id, owner, lease.attempt))
+        return cursor.rowcount == 1
+
+    def release(self, lease: Lease, owner: str) -> None:
+        """Gives up a leased job, so that it is retried if it has attempts
+        left."""
+        with self._transaction():
+            self.connection.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN "
+                "'failed' ELSE 'pending' END, owner = NULL, "
+                "lease_expires = NULL WHERE id = ? AND state = 'leased' AND "
+                "owner = ? AND attempts = ?",
+                (self.max_attempts, lease.id, owner, lease.attempt))
+
+    def collect(self, now: Optional[float] = None
+                ) -> List[Tuple[str, bool, Any]]:
+        """Returns the (name, done, result) of every job that finished since
+        the last call. The result of a failed job is None."""
+        now = time.time() if now is None else now
+        with self._transaction():
+            self._expire(now)
+            rows = self.connection.execute(
+                "SELECT id, name, state, result FROM jobs WHERE state IN "
+                "('done', 'failed') AND NOT collected ORDER BY id").fetchall()
+            self.connection.executemany(
+                "UPDATE jobs SET collected = 1 WHERE id = ?",
+                [(job_id,) for job_id, _, _, _ in rows])
+        return [(name, state == "done",
+                 None if result is None else json.loads(result))
+                for _, name, state, result in rows]
+
+    def unfinished(self) -> int:
+        """Returns the number of jobs that are pending or leased."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def owners(self) -> int:
+        """Returns the number of workers that completed a job."""
+        return self.connection.execute(
+            "SELECT COUNT(DISTINCT owner) FROM jobs WHERE state = 'done'"
+        ).fetchone()[0]
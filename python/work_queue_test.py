@@ -0,0 +1,91 @@
+import multiprocessing
+import tempfile
+import unittest
+from pathlib import Path
+
+from work_queue import WorkQueue
+
+
+def _drain(path, owner, results):
+    with WorkQueue(path) as queue:
+        while True:
+            lease = queue.lease(owner)
+            if lease is None:
+                return
+            queue.complete(lease, owner, lease.payload["n"] ** 2)
+            results.put((lease.name, owner))
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "queue.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lease_in_order(self):
+        with WorkQueue(self.path) as queue:
+            queue.reset([("a", {"n": 1}, 10.0), ("b", {"n": 2}, 10.0)])
+            self.assertEqual(2, queue.unfinished())
+            first = queue.lease("w1", now=0.0)
+            second = queue.lease("w2", now=0.0)
+            self.assertEqual(("a", {"n": 1}), (first.name, first.payload))
+            self.assertEqual("b", second.name)
+            self.assertIsNone(queue.lease("w3", now=0.0))
+            self.assertTrue(queue.complete(first, "w1", "done"))
+            self.assertEqual([("a", True, "done")], queue.collect(now=0.0))
+            self.assertEqual([], queue.collect(now=0.0))
+            self.assertEqual(1, queue.unfinished())
+
+    def test_expired_lease_is_retried(self):
+        with WorkQueue(self.path, max_attempts=2) as queue:
+            queue.reset([("a", {}, 10.0)])
+            stale = queue.lease("w1", now=0.0)
+            self.assertIsNone(queue.lease("w2", now=9.0))
+            retry = queue.lease("w2", now=10.0)
+            self.assertEqual((stale.id, 2), (retry.id, retry.attempt))
+            # The first worker's late result is discarded.
+            self.assertFalse(queue.complete(stale, "w1", "late"))
+            self.assertTrue(queue.complete(retry, "w2", "retried"))
+            self.assertEqual([("a", True, "retried")], queue.collect(now=10.0))
+
+    def test_abandoned_after_max_attempts(self):
+        with WorkQueue(self.path, max_attempts=2) as queue:
+            queue.reset([("a", {}, 10.0)])
+            queue.release(queue.lease("w1", now=0.0), "w1")
+            queue.lease("w2", now=0.0)
+            self.assertIsNone(queue.lease("w3", now=20.0))
+            self.assertEqual([("a", False, None)], queue.collect(now=20.0))
+            self.assertEqual(0, queue.unfinished())
+
+    def test_reset_discards_old_jobs(self):
+        with WorkQueue(self.path) as queue:
+            queue.reset([("a", {}, 10.0)])
+            old = queue.lease("w1", now=0.0)
+            queue.reset([("b", {}, 10.0)])
+            self.assertFalse(queue.complete(old, "w1", "old"))
+            self.assertEqual("b", queue.lease("w1", now=0.0).name)
+
+    def test_workers_lease_each_job_once(self):
+        with WorkQueue(self.path) as queue:
+            queue.reset([(str(n), {"n": n}, 60.0) for n in range(40)])
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_drain,
+                                           args=(self.path, f"w{i}", results))
+                   for i in range(3)]
+        for worker in workers:
+            worker.start()
+        leased = [results.get(timeout=60) for _ in range(40)]
+        for worker in workers:
+            worker.join(timeout=60)
+        self.assertEqual(sorted(str(n) for n in range(40)),
+                         sorted(name for name, _ in leased))
+        with WorkQueue(self.path) as queue:
+            collected = queue.collect()
+        self.assertEqual({str(n): n ** 2 for n in range(40)},
+                         {name: result for name, _, result in collected})
+
+
+if __name__ == "__main__":
+    unittest.main()